@@ -0,0 +1,51 @@
+"""Check that the placement export grows about linearly with the number of edges.
+
+Run from the repository root, e.g.
+
+    python -m benchmarks.check_placement_scaling --sizes 1000 8000
+
+The exit code is 1 if the scaling exponent between the two sizes reaches --max-exponent. This compares wall times,
+so it belongs on an otherwise idle machine rather than in the unit tests.
+"""
+import argparse
+import math
+import sys
+import time
+
+from interlocking_exporter.exporter import Exporter
+
+from .run_benchmarks import topology_parameters
+from .topology_generator import generate_topology
+
+
+def placement_time(size: int, repeat: int = 3) -> tuple[int, float]:
+    """The number of edges of a synthetic topology of the given size and the best time of its placement export"""
+    best = math.inf
+    for _ in range(repeat):
+        topology = generate_topology(**topology_parameters(size))
+        exporter = Exporter(topology, generate_routes=False)
+        # Generate the vacancy sections and axleCountingHeads before, they are not part of the placement
+        exporter.export_topology(include_routes=False)
+        start = time.perf_counter()
+        exporter.export_placement()
+        best = min(best, time.perf_counter() - start)
+    return len(topology.edges), best
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs=2, default=[1000, 8000], help="approximate numbers of edges")
+    parser.add_argument("--repeat", type=int, default=3, help="repetitions per size, the best time is kept")
+    # 1 for linear growth, the former lookup of the heads of each edge among all heads grew with about 2
+    parser.add_argument("--max-exponent", type=float, default=1.5)
+    args = parser.parse_args(argv)
+
+    small_edges, small_time = placement_time(min(args.sizes), args.repeat)
+    large_edges, large_time = placement_time(max(args.sizes), args.repeat)
+    exponent = math.log(large_time / small_time) / math.log(large_edges / small_edges)
+    print(f"export_placement from {small_edges} to {large_edges} edges: exponent {exponent:.2f}", file=sys.stderr)
+    return 1 if exponent >= args.max_exponent else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
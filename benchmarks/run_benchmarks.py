@@ -0,0 +1,169 @@
+"""Time the Exporter on synthetic topologies of growing size.
+
+Run from the repository root, e.g.
+
+    python -m benchmarks.run_benchmarks --sizes 10 100 1000 --output benchmark_results.json
+
+For each size the results contain the best wall time of each phase over all repetitions.
+The scaling exponent of a phase between two sizes is the slope of its time over the number of
+edges in a log-log plot, about 1 for linear and 2 for quadratic phases.
+The results also contain the time a fresh interpreter takes to import the exporter and the modules
+slowest to import, taken from `python -X importtime`.
+"""
+import argparse
+import json
+import math
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+from interlocking_exporter.exporter import Exporter
+
+from .topology_generator import generate_topology
+
+DEFAULT_SIZES = [10, 100, 1000, 10000, 100000]
+# Timed but not part of the scaling exponents, they prepare the benchmark rather than measure the exporter
+SETUP_PHASES = {"generate_topology"}
+
+
+def topology_parameters(size: int) -> dict:
+    """Parameters for a topology with roughly the given number of edges"""
+    return {
+        "line_length": max(size // 2, 10),
+        "points": size // 20,
+        "crossovers": size // 40,
+        "double_edge_loops": size // 40,
+        "signals_per_edge": 2,
+    }
+
+
+def run_once(parameters: dict, include_routes: bool) -> tuple[dict, dict]:
+    timings = {}
+
+    start = time.perf_counter()
+    topology = generate_topology(**parameters)
+    timings["generate_topology"] = time.perf_counter() - start
+
+    def measure(phase: str, function):
+        start = time.perf_counter()
+        result = function()
+        timings[phase] = time.perf_counter() - start
+        return result
+
+    exporter = None
+
+    def create_exporter():
+        nonlocal exporter
+        exporter = Exporter(topology, generate_routes=include_routes)
+
+    measure("constructor", create_exporter)
+    measure("export_placement", exporter.export_placement)
+    exported_topology = measure("export_topology", lambda: exporter.export_topology(include_routes))
+    if include_routes:
+        measure("export_routes", exporter.export_routes)
+
+    counts = {
+        "nodes": len(topology.nodes),
+        "edges": len(topology.edges),
+        "signals": len(topology.signals),
+        # Generated routes are kept by the exporter, not added to the topology
+        "routes": len(exported_topology["routes"]),
+    }
+    return counts, timings
+
+
+def scaling_exponents(results: list[dict]) -> dict:
+    exponents = {}
+    for smaller, larger in zip(results, results[1:]):
+        edge_ratio = larger["counts"]["edges"] / smaller["counts"]["edges"]
+        if edge_ratio <= 1:
+            continue
+        for phase, duration in larger["timings"].items():
+            if phase in SETUP_PHASES:
+                continue
+            previous_duration = smaller["timings"].get(phase)
+            if not previous_duration or not duration:
+                continue
+            exponents.setdefault(phase, []).append(
+                {
+                    "from_edges": smaller["counts"]["edges"],
+                    "to_edges": larger["counts"]["edges"],
+                    "exponent": math.log(duration / previous_duration) / math.log(edge_ratio),
+                }
+            )
+    return exponents
+
+
+def run_python(code: str, *options: str) -> tuple[float, str]:
+    """Run code in a fresh interpreter, returning its wall time and stderr"""
+    start = time.perf_counter()
+    process = subprocess.run([sys.executable, *options, "-c", code], capture_output=True, text=True, check=True)
+    return time.perf_counter() - start, process.stderr
+
+
+def import_time(repeat: int, module: str = "interlocking_exporter.exporter", slowest: int = 10) -> dict:
+    """The best time over all repetitions to start an interpreter and import the module, without the
+    time of starting an empty interpreter, and the modules with the highest cumulative import time"""
+    interpreter = min(run_python("pass")[0] for _ in range(repeat))
+    cold_start = min(run_python(f"import {module}")[0] for _ in range(repeat))
+    # Lines look like "import time:   self [us] | cumulative | imported package"
+    modules = {}
+    for line in run_python(f"import {module}", "-X", "importtime")[1].splitlines():
+        fields = line.partition("import time:")[2].split("|")
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue
+        modules[fields[2].strip()] = int(fields[1]) / 1e6
+    return {
+        "module": module,
+        "interpreter": interpreter,
+        "import": max(cold_start - interpreter, 0.0),
+        "slowest_modules": dict(sorted(modules.items(), key=lambda item: item[1], reverse=True)[:slowest]),
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="approximate numbers of edges")
+    parser.add_argument("--repeat", type=int, default=3, help="repetitions per size, the best time is kept")
+    parser.add_argument("--no-routes", action="store_true", help="skip route generation and export")
+    parser.add_argument("--output", default="benchmark_results.json", help="file to write the results to")
+    args = parser.parse_args(argv)
+
+    imports = import_time(args.repeat)
+    print(f"import {imports['module']}: {imports['import']:.4f}s", file=sys.stderr)
+
+    results = []
+    for size in sorted(args.sizes):
+        parameters = topology_parameters(size)
+        best = {}
+        for _ in range(args.repeat):
+            counts, timings = run_once(parameters, not args.no_routes)
+            for phase, duration in timings.items():
+                best[phase] = min(duration, best.get(phase, duration))
+        results.append({"size": size, "parameters": parameters, "counts": counts, "timings": best})
+        print(
+            f"{counts['edges']:>8} edges: "
+            + ", ".join(f"{phase} {duration:.4f}s" for phase, duration in best.items()),
+            file=sys.stderr,
+        )
+
+    with open(args.output, "w") as fp:
+        json.dump(
+            {
+                "created": datetime.now(timezone.utc).isoformat(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "repeat": args.repeat,
+                "results": results,
+                "scaling_exponents": scaling_exponents(results),
+                "import_time": imports,
+            },
+            fp,
+            indent=2,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Generate synthetic yaramo topologies of arbitrary size for benchmarking.
+
+The topology consists of a main line and, if there are crossovers, a parallel line of the same length.
+Single points with a short siding, crossovers between both lines and loops of two edges between two
+points (like b-f in examples/SimpleExampleServer.py) are placed at random positions along the lines.
+"""
+import random
+
+from yaramo.model import (
+    Topology,
+    Node,
+    Edge,
+    Signal,
+    SignalDirection,
+    SignalFunction,
+    SignalKind,
+)
+
+
+class _TrackNode:
+    """A node on one of the lines together with the branches pointing to its neighbours on that line"""
+
+    def __init__(self, node: Node, previous_branches: list[str], next_branches: list[str]) -> None:
+        self.node = node
+        self.previous_branches = previous_branches
+        self.next_branches = next_branches
+
+
+def _connect(node_a: Node, branch_a: str, node_b: Node, branch_b: str) -> None:
+    getattr(node_a, f"set_connection_{branch_a}")(node_b)
+    getattr(node_b, f"set_connection_{branch_b}")(node_a)
+
+
+def generate_topology(
+    line_length: int = 10,
+    points: int = 0,
+    crossovers: int = 0,
+    double_edge_loops: int = 0,
+    signals_per_edge: int = 1,
+    seed: int = 0,
+) -> Topology:
+    """Generate a topology whose main line has line_length edges.
+    Each point, crossover and loop occupies its own position on the main line, so they have to fit into it."""
+    if points + crossovers + 2 * double_edge_loops > line_length - 1:
+        raise ValueError("The line is too short for the requested number of points, crossovers and loops")
+
+    rnd = random.Random(seed)
+    nodes: list[Node] = []
+    edges: list[Edge] = []
+    signals: list[Signal] = []
+
+    def add_node(name: str) -> Node:
+        node = Node(name=name)
+        nodes.append(node)
+        return node
+
+    def add_edge(node_a: Node, node_b: Node) -> None:
+        edge = Edge(node_a, node_b, length=rnd.randint(50, 1000))
+        for index in range(signals_per_edge):
+            signal = Signal(
+                edge,
+                (index + 1) / (signals_per_edge + 1),
+                SignalDirection.IN if index % 2 == 0 else SignalDirection.GEGEN,
+                SignalFunction.Block_Signal,
+                SignalKind.Hauptsignal,
+                name=f"S{len(signals)}",
+            )
+            edge.signals.append(signal)
+            signals.append(signal)
+        edges.append(edge)
+
+    def plain_line(name: str) -> list[_TrackNode]:
+        line = [_TrackNode(add_node(f"{name}0"), [], ["head"])]
+        line += [_TrackNode(add_node(f"{name}{i}"), ["left"], ["head"]) for i in range(1, line_length)]
+        line.append(_TrackNode(add_node(f"{name}{line_length}"), ["head"], []))
+        return line
+
+    main_line = plain_line("A")
+    parallel_line = plain_line("B") if crossovers else []
+
+    # Draw the positions on the main line from one shuffled list, loops need two consecutive positions.
+    # Each kind of feature passes over the list once, so this takes time in proportion to the line's length.
+    shuffled_positions = list(range(1, line_length))
+    rnd.shuffle(shuffled_positions)
+    free_positions = set(shuffled_positions)
+    placed_features = []
+    for feature, count in [("loop", double_edge_loops), ("crossover", crossovers), ("point", points)]:
+        candidates = (
+            position
+            for position in shuffled_positions
+            if position in free_positions
+            and (feature != "loop" or position + 1 in free_positions)
+            and (feature != "crossover" or position + 1 < line_length)
+        )
+        for _ in range(count):
+            position = next(candidates, None)
+            if position is None:
+                raise ValueError("Could not place all points, crossovers and loops on the line")
+            free_positions.discard(position)
+            if feature == "loop":
+                free_positions.discard(position + 1)
+            placed_features.append((feature, position))
+
+    for feature, position in placed_features:
+        track_node = main_line[position]
+        if feature == "point":
+            track_node.previous_branches, track_node.next_branches = ["head"], ["right"]
+            siding_end = add_node(f"{track_node.node.name}-siding")
+            _connect(track_node.node, "left", siding_end, "head")
+            add_edge(track_node.node, siding_end)
+        elif feature == "crossover":
+            track_node.previous_branches, track_node.next_branches = ["head"], ["right"]
+            other = parallel_line[position + 1]
+            other.previous_branches, other.next_branches = ["right"], ["head"]
+            _connect(track_node.node, "left", other.node, "left")
+            add_edge(track_node.node, other.node)
+        else:
+            track_node.previous_branches, track_node.next_branches = ["head"], ["left", "right"]
+            main_line[position + 1].previous_branches = ["left", "right"]
+            main_line[position + 1].next_branches = ["head"]
+
+    for line in [main_line, parallel_line]:
+        for previous, current in zip(line, line[1:]):
+            for previous_branch, branch in zip(previous.next_branches, current.previous_branches):
+                _connect(previous.node, previous_branch, current.node, branch)
+                add_edge(previous.node, current.node)
+
+    topology = Topology()
+    topology.nodes = {node.uuid: node for node in nodes}
+    topology.edges = {edge.uuid: edge for edge in edges}
+    topology.signals = {signal.uuid: signal for signal in signals}
+    return topology
@@ -0,0 +1,129 @@
+"""On-disk cache of finished exports, keyed by a hash of the topology's content."""
+import hashlib
+import json
+import os
+import tempfile
+
+from yaramo.model import Topology
+
+# Increase when the export format changes, so entries written by older versions are not used
+CACHE_FORMAT_VERSION = 1
+
+
+def topology_hash(topology: Topology, *salt) -> str:
+    """Hash the nodes, edges, signals, connections and existing routes of a topology.
+    The hash does not depend on the order of the elements in the topology's dicts."""
+    sha = hashlib.sha256()
+
+    def update(*values):
+        sha.update(json.dumps(values, default=str).encode("utf-8"))
+
+    def uuid_of(element):
+        return element.uuid if element is not None else None
+
+    update(CACHE_FORMAT_VERSION, *salt)
+    for node in sorted(topology.nodes.values(), key=lambda node: node.uuid):
+        update(
+            "node",
+            node.uuid,
+            node.name,
+            node.turnout_side,
+            uuid_of(node.connected_on_head),
+            uuid_of(node.connected_on_left),
+            uuid_of(node.connected_on_right),
+            [uuid_of(connected_node) for connected_node in node.connected_nodes],
+        )
+    for edge in sorted(topology.edges.values(), key=lambda edge: edge.uuid):
+        update(
+            "edge",
+            edge.uuid,
+            edge.node_a.uuid,
+            edge.node_b.uuid,
+            edge.length,
+            uuid_of(getattr(edge, "vacancy_section", None)),
+            [signal.uuid for signal in edge.signals],
+        )
+    for signal in sorted(topology.signals.values(), key=lambda signal: signal.uuid):
+        update(
+            "signal",
+            signal.uuid,
+            signal.name,
+            signal.edge.uuid,
+            signal.distance_edge,
+            signal.direction,
+            signal.function,
+            signal.kind,
+            [state.name for state in signal.supported_states],
+            [
+                [type(add_signal).__name__, [symbol.name for symbol in add_signal.symbols]]
+                for add_signal in signal.additional_signals
+            ],
+        )
+    for route in sorted(topology.routes.values(), key=lambda route: route.uuid):
+        update(
+            "route",
+            route.uuid,
+            route.start_signal.uuid,
+            route.end_signal.uuid,
+            route.maximum_speed,
+            [edge.uuid for edge in route.edges],
+        )
+    return sha.hexdigest()
+
+
+class ExportCache:
+    """A directory of cached exports, one JSON file per key.
+    When the files exceed max_size bytes, the least recently used ones are removed."""
+
+    def __init__(self, directory: str, max_size: int = 512 * 1024 * 1024) -> None:
+        self.directory = directory
+        self.max_size = max_size
+        os.makedirs(directory, exist_ok=True)
+
+    def __path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str) -> dict | list | None:
+        """Load the export stored for the key, or None if there is none"""
+        path = self.__path(key)
+        try:
+            with open(path) as fp:
+                entry = json.load(fp)
+            # Mark as recently used
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return entry
+
+    def put(self, key: str, entry: dict | list) -> None:
+        """Store the export for the key and evict old entries if the cache got too large"""
+        fd, temporary_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as fp:
+                json.dump(entry, fp)
+            os.replace(temporary_path, self.__path(key))
+        except BaseException:
+            os.unlink(temporary_path)
+            raise
+        self.__evict()
+
+    def __evict(self) -> None:
+        entries = []
+        for file_name in os.listdir(self.directory):
+            if not file_name.endswith(".json"):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.directory, file_name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, file_name))
+
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, file_name in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            try:
+                os.unlink(os.path.join(self.directory, file_name))
+            except OSError:
+                continue
+            total_size -= size
@@ -0,0 +1,185 @@
+"""Export many stations in one run.
+
+    interlocking-exporter manifest.json --output exports --workers 8
+
+The manifest is a JSON list of stations. Each station is either the path of its topology or an object with the
+path as "input" and optionally a "name" and the Exporter options "generate_routes" and
+"generate_vacancy_sections". Paths are relative to the manifest. Topologies ending in .json are read as yaramo
+JSON, all others as pickled yaramo Topology objects.
+
+Each station is exported in a worker process into its own directory below the output directory, which gets
+topology, placement and routes files. A failing station is reported and the others go on. At the end a timing
+summary is printed and written to summary.json in the output directory, the exit code is 1 if any station failed.
+"""
+import argparse
+import json
+import os
+import pickle
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from yaramo.model import Topology
+
+from . import serializers
+from .exporter import Exporter
+from .streaming import write_placement, write_routes, write_topology
+
+EXPORTER_OPTIONS = ("generate_routes", "generate_vacancy_sections")
+
+
+def read_manifest(path: str) -> list[dict]:
+    """Read the stations of a manifest, each with its "name", absolute "input" path and "options" for the Exporter"""
+    with open(path) as fp:
+        entries = json.load(fp)
+    base_directory = os.path.dirname(os.path.abspath(path))
+    stations = []
+    names = set()
+    for entry in entries:
+        if isinstance(entry, str):
+            entry = {"input": entry}
+        input_path = os.path.join(base_directory, entry["input"])
+        name = entry.get("name") or os.path.splitext(os.path.basename(input_path))[0]
+        if name in names:
+            raise ValueError(f"The station name {name!r} appears more than once in {path}")
+        names.add(name)
+        options = {option: entry[option] for option in EXPORTER_OPTIONS if option in entry}
+        stations.append({"name": name, "input": input_path, "options": options})
+    return stations
+
+
+def load_topology(path: str) -> Topology:
+    if path.endswith(".json"):
+        with open(path) as fp:
+            return Topology.from_json(fp.read())
+    with open(path, "rb") as fp:
+        topology = pickle.load(fp)
+    if not isinstance(topology, Topology):
+        raise TypeError(f"{path} does not contain a pickled Topology but a {type(topology).__name__}")
+    return topology
+
+
+def export_station(station: dict, output_directory: str, format: str = "json") -> dict:
+    """Export one station and return its result with the time of each phase.
+    Errors are part of the result instead of being raised, so that the other stations go on."""
+    timings = {}
+    result = {"name": station["name"], "input": station["input"], "timings": timings}
+    start = time.perf_counter()
+    phase = "load"
+    try:
+        topology = load_topology(station["input"])
+        timings["load"] = time.perf_counter() - start
+
+        phase = "setup"
+        exporter = Exporter(topology, **station["options"])
+        directory = os.path.join(output_directory, station["name"])
+        os.makedirs(directory, exist_ok=True)
+        for phase, write, export in [
+            ("topology", write_topology, exporter.export_topology),
+            ("placement", write_placement, exporter.export_placement),
+            ("routes", write_routes, exporter.export_routes),
+        ]:
+            phase_start = time.perf_counter()
+            if format == "json":
+                with open(os.path.join(directory, f"{phase}.json"), "w", encoding="utf-8") as fp:
+                    write(exporter, fp)
+            else:
+                with open(os.path.join(directory, f"{phase}.{format}"), "wb") as fp:
+                    fp.write(serializers.dumps(export(), format))
+            timings[phase] = time.perf_counter() - phase_start
+        result["status"] = "ok"
+    except Exception as error:
+        result["status"] = "failed"
+        result["error"] = f"{phase}: {type(error).__name__}: {error}"
+        result["traceback"] = traceback.format_exc()
+    timings["total"] = time.perf_counter() - start
+    return result
+
+
+def export_stations(
+    stations: list[dict], output_directory: str, workers: int | None = None, format: str = "json", progress=None
+) -> list[dict]:
+    """Export the stations across a pool of worker processes, returning the results in the order of the stations.
+    progress is called with each result as soon as its station is done."""
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(export_station, station, output_directory, format): station for station in stations
+        }
+        for future in as_completed(futures):
+            station = futures[future]
+            try:
+                result = future.result()
+            except Exception as error:
+                # The worker itself failed, e.g. it was killed
+                result = {
+                    "name": station["name"],
+                    "input": station["input"],
+                    "status": "failed",
+                    "error": f"{type(error).__name__}: {error}",
+                    "timings": {},
+                }
+            results[station["name"]] = result
+            if progress:
+                progress(result)
+    return [results[station["name"]] for station in stations]
+
+
+def format_summary(results: list[dict]) -> str:
+    phases = ["load", "topology", "placement", "routes", "total"]
+    name_width = max([len("station")] + [len(result["name"]) for result in results])
+    lines = [f"{'station':<{name_width}}  {'status':<6}" + "".join(f"  {phase:>9}" for phase in phases)]
+    for result in results:
+        timings = result["timings"]
+        lines.append(
+            f"{result['name']:<{name_width}}  {result['status']:<6}"
+            + "".join(
+                f"  {timings[phase]:>8.2f}s" if phase in timings else f"  {'-':>9}" for phase in phases
+            )
+        )
+    failed = sum(result["status"] != "ok" for result in results)
+    total = sum(result["timings"].get("total", 0) for result in results)
+    lines.append(f"{len(results) - failed} of {len(results)} stations exported, {total:.2f}s of export time")
+    return "\n".join(lines)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Export the stations of a manifest across a pool of processes")
+    parser.add_argument("manifest", help="JSON list of the topologies to export")
+    parser.add_argument("--output", default="exports", help="directory to write the exports to")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes, all cores by default")
+    parser.add_argument(
+        "--format",
+        default="json",
+        choices=serializers.available_formats(),
+        help="format of the written exports, msgpack and cbor need the formats extra",
+    )
+    args = parser.parse_args(argv)
+
+    stations = read_manifest(args.manifest)
+    os.makedirs(args.output, exist_ok=True)
+    done = 0
+
+    def progress(result: dict) -> None:
+        nonlocal done
+        done += 1
+        message = f"[{done}/{len(stations)}] {result['name']}: {result['status']}"
+        if result["status"] == "ok":
+            message += f" in {result['timings']['total']:.2f}s"
+        else:
+            message += f" ({result['error']})"
+        print(message, file=sys.stderr)
+
+    start = time.perf_counter()
+    results = export_stations(stations, args.output, args.workers, args.format, progress)
+    print(format_summary(results), file=sys.stderr)
+    print(f"Wall time {time.perf_counter() - start:.2f}s", file=sys.stderr)
+
+    with open(os.path.join(args.output, "summary.json"), "w") as fp:
+        json.dump(results, fp, indent=2)
+    return 1 if any(result["status"] != "ok" for result in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+"""Compare exports and describe the differences between them as patches.
+
+A patch of a dict of entries, e.g. the "edges" of export_topology(), looks like
+
+    {"added": {id: entry}, "removed": [id], "changed": {id: entry}}
+
+where changed entries are replaced as a whole. Empty parts are left out. A patch of an export consisting of
+sections maps each changed section to such a patch, the routes of export_routes() are patched by their uuid.
+A patch of all exports maps "topology", "placement" and "routes" to their patches. An empty patch means that
+nothing changed.
+
+When it is known which entries may have changed, passing their keys restricts the comparison to them.
+"""
+import copy
+from typing import Iterable
+
+
+def diff_entries(old: dict, new: dict, keys: Iterable[str] | None = None) -> dict:
+    """Compare two dicts of export entries, e.g. the "edges" of two topology exports.
+    With keys, only the entries with these keys are compared."""
+    if keys is not None:
+        keys = dict.fromkeys(keys)
+        old = {key: old[key] for key in keys if key in old}
+        new = {key: new[key] for key in keys if key in new}
+    patch = {
+        "added": {key: entry for key, entry in new.items() if key not in old},
+        "removed": [key for key in old if key not in new],
+        "changed": {
+            key: entry
+            for key, entry in new.items()
+            if key in old and old[key] is not entry and old[key] != entry
+        },
+    }
+    return {part: changes for part, changes in patch.items() if changes}
+
+
+def diff_sections(old: dict[str, dict], new: dict[str, dict], keys: dict[str, Iterable[str]] | None = None) -> dict:
+    """Compare each section of two exports consisting of sections, like export_topology() and export_placement().
+    With keys, only the given sections and in them only the entries with the given keys are compared."""
+    sections = dict.fromkeys([*old, *new]) if keys is None else keys
+    patch = {
+        section: diff_entries(old.get(section, {}), new.get(section, {}), None if keys is None else keys[section])
+        for section in sections
+    }
+    return {section: changes for section, changes in patch.items() if changes}
+
+
+def routes_by_uuid(routes: list[dict]) -> dict[str, dict]:
+    return {route["uuid"]: route for route in routes}
+
+
+def diff_routes(old: list[dict], new: list[dict], uuids: Iterable[str] | None = None) -> dict:
+    """Compare two results of export_routes() by the uuids of the routes, only those with the given uuids if any"""
+    return diff_entries(routes_by_uuid(old), routes_by_uuid(new), uuids)
+
+
+def diff_exports(old: dict, new: dict, keys: dict | None = None) -> dict:
+    """Compare two dicts holding the results of export_topology(), export_placement() and export_routes()
+    as "topology", "placement" and "routes". Missing exports count as empty.
+    keys can restrict the comparison like that of the single exports, e.g.
+    {"topology": {"edges": [uuid]}, "placement": {}, "routes": [uuid]}."""
+    keys = keys or {}
+    patch = {
+        "topology": diff_sections(old.get("topology", {}), new.get("topology", {}), keys.get("topology")),
+        "placement": diff_sections(old.get("placement", {}), new.get("placement", {}), keys.get("placement")),
+        "routes": diff_routes(old.get("routes", []), new.get("routes", []), keys.get("routes")),
+    }
+    return {kind: changes for kind, changes in patch.items() if changes}
+
+
+def apply_entries_patch(entries: dict, patch: dict) -> dict:
+    """Apply a patch created by diff_entries(), returning the patched entries without changing the given ones"""
+    removed = set(patch.get("removed", []))
+    patched = {key: entry for key, entry in entries.items() if key not in removed}
+    patched.update(copy.deepcopy(patch.get("changed", {})))
+    patched.update(copy.deepcopy(patch.get("added", {})))
+    return patched
+
+
+def apply_sections_patch(sections: dict[str, dict], patch: dict) -> dict:
+    """Apply a patch created by diff_sections()"""
+    patched = dict(sections)
+    for section, section_patch in patch.items():
+        patched[section] = apply_entries_patch(sections.get(section, {}), section_patch)
+    return patched
+
+
+def apply_routes_patch(routes: list[dict], patch: dict) -> list[dict]:
+    """Apply a patch created by diff_routes(), added routes are appended"""
+    return list(apply_entries_patch(routes_by_uuid(routes), patch).values())
+
+
+def apply_patch(exports: dict, patch: dict) -> dict:
+    """Apply a patch created by diff_exports()"""
+    return {
+        "topology": apply_sections_patch(exports.get("topology", {}), patch.get("topology", {})),
+        "placement": apply_sections_patch(exports.get("placement", {}), patch.get("placement", {})),
+        "routes": apply_routes_patch(exports.get("routes", []), patch.get("routes", {})),
+    }
@@ -1,238 +1,880 @@
-from collections import defaultdict
+from collections import defaultdict, OrderedDict
+from contextlib import nullcontext
+from typing import Iterable, Iterator
 import json
+import threading
+import uuid
 from yaramo.model import Topology, Node, Edge, SignalDirection, Signal
-from yaramo.additional_signal import AdditionalSignalZs3, AdditionalSignalZs3v, AdditionalSignalZs2, AdditionalSignalZs2v
 from yaramo.signal import SignalKind
-from railwayroutegenerator.routegenerator import RouteGenerator
-from vacancy_section_generator.generator import VacancySectionGenerator
+
+from .cache import ExportCache, topology_hash
+from .delta import diff_exports, routes_by_uuid
+from .graph import GraphIndex, CODE_NAMES, NO_ID, UNSET, LEFT, RIGHT, HEAD, NORMAL, REVERSE
+from .records import AxleCountingHead, TrackVacancySection
+from .spatial import GridIndex
+from .stats import ExportStats
+
+# Namespace of the uuid5 ids of the axleCountingHeads, which are derived from their edge and side
+AXLE_COUNTING_HEAD_NAMESPACE = uuid.UUID("955ed1c6-d31c-485f-837b-2298f5b380bf")
+
+
+def axle_counting_head_id(edge_uuid: str, side: str) -> str:
+    """The id of the axleCountingHead on the given side ("L" or "R") of an edge, the same in every export"""
+    return str(uuid.uuid5(AXLE_COUNTING_HEAD_NAMESPACE, f"{edge_uuid}/{side}"))
 
 
 class Exporter:
-    def __init__(self, topology: Topology, generate_routes = True, generate_vacancy_sections = True) -> None:
+    def __init__(self, topology: Topology, generate_routes = True, generate_vacancy_sections = True, signal_state_cache_size = 1024, cache: ExportCache | None = None, stats: ExportStats | None = None) -> None:
+        """The preparation of the topology (generating vacancy sections and routes, orienting nodes,
+        adding axleCountingHeads) is deferred until an export needs its result.
+        With a cache, the exports are served from it if the same topology was exported before.
+        Everything derived from the topology is kept by the exporter, the topology is only read. The exception are
+        edges without a vacancy section, which get one from the vacancy section generator.
+        With stats, the time of each preparation step and export and the counts of the hot paths are recorded in it."""
         self.topology = topology
-        if generate_vacancy_sections:
-            VacancySectionGenerator(topology).generate()
-        if generate_routes:
-            RouteGenerator(self.topology).generate_routes()
-        self.__ensure_nodes_orientations()
-        self.__add_axleCountingHeads_and_vacancySections()
-
-    def export_routes(self):
-        output = []
-        for route_uuid, route in self.topology.routes.items():
-            previous_node = route.start_signal.previous_node()
-            route_json = {
-                "start_signal": self.generate_signal_state(route.start_signal, route.maximum_speed),
-                "end_signal": self.generate_signal_state(route.end_signal, route.maximum_speed),
-                "uuid": route_uuid
+        self.stats = stats
+        # Guards the preparation steps, the signal state cache and apply_changes(), so that several threads
+        # can export from the same exporter. Use a SnapshotHolder to serve exports while the topology changes.
+        self.__lock = threading.RLock()
+        self.__cache = cache
+        self.__cache_key = topology_hash(topology, generate_routes, generate_vacancy_sections) if cache else None
+        # Cache entry ("topology_and_routes" or "placement") -> its content, as far as they were taken from or
+        # put into the cache
+        self.__cached_exports = {}
+        # (signal uuid, max speed) -> (fingerprint of the signal, signal state), least recently used first
+        self.__signal_states = OrderedDict()
+        self.__signal_state_cache_size = signal_state_cache_size
+        self.__generate_routes = generate_routes
+        self.__generate_vacancy_sections = generate_vacancy_sections
+        # step -> (steps it depends on, function running it)
+        self.__steps = {
+            "vacancy_sections": ((), self.__run_vacancy_section_generator),
+            "routes": ((), self.__run_route_generator),
+            "graph_index": (("vacancy_sections",), self.__build_graph_index),
+            "orientations": (("graph_index",), self.__ensure_orientations),
+            "route_traversals": (("graph_index",), self.__build_route_traversals),
+            "axle_counting_heads": (("vacancy_sections",), self.__add_axleCountingHeads_and_vacancySections),
+            "spatial_index": (("graph_index",), self.__build_spatial_index),
+            "route_index": (("routes", "graph_index"), self.__build_route_index),
+        }
+        self.__completed_steps = set()
+        # The latest result of each export, which apply_changes() compares against
+        self.__last_exports = {}
+
+    def __cached(self, kind: str) -> dict | None:
+        """The cache entry of the given kind if it is in the cache"""
+        export = self.__cached_exports.get(kind)
+        if export is None:
+            export = self.__cache.get(f"{self.__cache_key}.{kind}")
+            if export is not None:
+                self.__cached_exports[kind] = export
+        return export
+
+    def __from_cache(self, kind: str, export) -> dict:
+        """Get a cache entry of the topology, creating and storing it on a miss.
+        The topology and routes exports are one entry, as both contain the uuids of the trackVacancySections
+        and these may differ with each run of the VacancySectionGenerator. The placement has an entry of its own,
+        so that it does not generate the routes."""
+        with self.__lock:
+            result = self.__cached(kind)
+            if result is None:
+                result = export()
+                self.__cache.put(f"{self.__cache_key}.{kind}", result)
+                self.__cached_exports[kind] = result
+            return result
+
+    def apply_changes(self, added: Iterable = (), removed: Iterable = (), modified: Iterable = ()) -> dict:
+        """Update the exports after the topology was edited and return how they changed.
+
+        added and removed are nodes, edges and signals to add to or remove from the topology, the signals of a
+        removed edge are removed along with it. modified are elements of the topology that were changed in place.
+        Only the axleCountingHeads, trackVacancySections and export entries of the changed elements, and the routes
+        touching them, are recreated. Only the connected components containing changed nodes are oriented and placed
+        again, and only the recreated entries are compared for the result. The route generator only runs if signals
+        or edges are added or removed or signals are modified, and then on the whole topology.
+        Rebuilding the graph index and the route traversals and copying the previous exports still take time in
+        proportion to the size of the topology, though much less than exporting it again.
+
+        Unlike the other methods, this edits the exported topology.
+        The result is the patch from the previous exports to the new ones, see `delta.diff_exports()`.
+        Elements that are modified in place are only part of the delta if they were exported before the change.
+        """
+        with self.__lock:
+            return self.__apply_changes(added, removed, modified)
+
+    def __apply_changes(self, added: Iterable, removed: Iterable, modified: Iterable) -> dict:
+        for kind, export in [
+            ("topology", self.export_topology),
+            ("placement", self.export_placement),
+            ("routes", self.export_routes),
+        ]:
+            if kind not in self.__last_exports:
+                export()
+        # The previous orientations are taken over for the components without changes
+        self.__require("vacancy_sections", "routes", "axle_counting_heads", "orientations")
+        previous = dict(self.__last_exports)
+
+        added, removed, modified = list(added), list(removed), list(modified)
+        for element in added:
+            self.__elements_of(element)[element.uuid] = element
+        for element in list(removed):
+            self.__elements_of(element).pop(element.uuid, None)
+            if isinstance(element, Edge):
+                for signal in element.signals:
+                    self.topology.signals.pop(signal.uuid, None)
+                    removed.append(signal)
+
+        # Collect the uuids of the changed elements in a stable order
+        changed_elements = added + removed + modified
+        changed_edges = {}
+        for element in changed_elements:
+            if isinstance(element, Edge):
+                changed_edges[element.uuid] = element
+            elif isinstance(element, Signal):
+                changed_edges[element.edge.uuid] = element.edge
+        changed_signals = dict.fromkeys(
+            [element.uuid for element in changed_elements if isinstance(element, Signal)]
+            + [signal.uuid for edge in changed_edges.values() for signal in edge.signals]
+        )
+        changed_nodes = dict.fromkeys(
+            [element.uuid for element in changed_elements if isinstance(element, Node)]
+            + [node.uuid for edge in changed_edges.values() for node in [edge.node_a, edge.node_b]]
+        )
+
+        if self.__generate_vacancy_sections and any(
+            getattr(edge, "vacancy_section", None) is None
+            for uuid, edge in changed_edges.items()
+            if uuid in self.topology.edges
+        ):
+            from vacancy_section_generator.generator import VacancySectionGenerator
+
+            VacancySectionGenerator(self.topology).generate()
+            # The generator may have assigned new vacancy sections to other edges as well
+            for uuid, heads in self.__axleCountingHeads_per_edge.items():
+                edge = self.topology.edges.get(uuid)
+                if edge is not None and heads[0].vacancy_section != edge.vacancy_section.uuid:
+                    changed_edges[uuid] = edge
+        changed_vacancy_sections = self.__update_axleCountingHeads_and_vacancySections(list(changed_edges))
+
+        # The new graph index starts without route traversals and only takes over the orientations of the
+        # components without changes, the indexes of export_subgraph() are rebuilt when it is used next
+        previous_graph = self.__graph
+        self.__build_graph_index()
+        changed_components = self.__take_over_orientations(previous_graph, changed_nodes)
+        self.__completed_steps -= {"orientations", "route_traversals", "spatial_index", "route_index"}
+        self.__require("orientations", "route_traversals")
+
+        # Other changes, e.g. of lengths or names, do not change which routes there are
+        generate_routes = any(isinstance(element, (Signal, Edge)) for element in added + removed) or any(
+            isinstance(element, Signal) for element in modified
+        )
+        changed_routes = self.__update_routes(changed_edges, changed_signals, changed_nodes, generate_routes)
+
+        topology = {section: dict(entries) for section, entries in previous["topology"].items()}
+        for uuid in changed_edges:
+            edge = self.topology.edges.get(uuid)
+            for side in ["L", "R"]:
+                topology["axleCountingHeads"].pop(axle_counting_head_id(uuid, side), None)
+            if edge is None:
+                topology["edges"].pop(uuid, None)
+                continue
+            topology["edges"][uuid] = self.__topology_edge(edge)
+            for head in self.__axleCountingHeads_per_edge[uuid]:
+                topology["axleCountingHeads"][head.id] = head.as_dict()
+        for uuid in changed_nodes:
+            node = self.topology.nodes.get(uuid)
+            if node is not None and self.__is_topology_point(node):
+                topology["points"][uuid] = self.__topology_point(node)
+            else:
+                topology["points"].pop(uuid, None)
+        for uuid in changed_signals:
+            signal = self.topology.signals.get(uuid)
+            if signal is not None and self.__is_signal(signal):
+                topology["signals"][uuid] = self.__topology_signal(signal)
+            else:
+                topology["signals"].pop(uuid, None)
+        # The entries of the nodes are named after their edges, so those of the neighbours can change as well
+        def neighbourhood(graph: GraphIndex) -> list[int]:
+            node_ids = [graph.node_ids[uuid] for uuid in changed_nodes if uuid in graph.node_ids]
+            return node_ids + [graph.other_node(edge_id, node_id) for node_id in node_ids for edge_id in graph.edges_of(node_id)]
+
+        changed_node_entries = {
+            key: None
+            for graph in (previous_graph, self.__graph)
+            for node_id in neighbourhood(graph)
+            for key, _ in self.__topology_node_entries(graph, node_id)
+        }
+        for key in changed_node_entries:
+            topology["nodes"].pop(key, None)
+        for node_id in neighbourhood(self.__graph):
+            topology["nodes"].update(self.__topology_node_entries(self.__graph, node_id))
+        for tvs_uuid in changed_vacancy_sections:
+            tvs = self.__trackVacancySections.get(tvs_uuid)
+            if tvs is None:
+                topology["trackVacancySections"].pop(tvs_uuid, None)
+            else:
+                topology["trackVacancySections"][tvs_uuid] = tvs.as_dict()
+
+        routes = routes_by_uuid(previous["routes"])
+        for uuid in changed_routes:
+            route = self.__routes.get(uuid)
+            if route is None:
+                topology["routes"].pop(uuid, None)
+                routes.pop(uuid, None)
+                continue
+            topology["routes"][uuid] = self.__topology_route(route)
+            routes[uuid] = self.__export_route(uuid, route)
+
+        placement = {section: dict(entries) for section, entries in previous["placement"].items()}
+        graph = self.__graph
+        changed_points = dict.fromkeys(changed_nodes)
+        changed_points.update(
+            (graph.nodes[node_id].uuid, None) for component in changed_components for node_id in graph.components[component]
+        )
+        changed_placement_edges = dict.fromkeys(changed_edges)
+        changed_placement_edges.update(
+            (graph.edges[edge_id].uuid, None)
+            for component in changed_components
+            for node_id in graph.components[component]
+            for edge_id in graph.edges_of(node_id)
+        )
+        for uuid in changed_points:
+            placement["points"].pop(uuid, None)
+        for uuid in changed_placement_edges:
+            placement["edges"].pop(uuid, None)
+        for section, entries in self.iter_placement(changed_components):
+            placement[section].update(entries)
+
+        exports = {
+            "topology": topology,
+            "placement": placement,
+            "routes": [routes[uuid] for uuid in self.__routes if uuid in routes],
+        }
+        delta = diff_exports(previous, exports, {
+            "topology": {
+                "edges": changed_edges,
+                "nodes": changed_node_entries,
+                "points": changed_nodes,
+                "signals": changed_signals,
+                "axleCountingHeads": [
+                    axle_counting_head_id(uuid, side) for uuid in changed_edges for side in ["L", "R"]
+                ],
+                "routes": changed_routes,
+                "trackVacancySections": changed_vacancy_sections,
+            },
+            "placement": {"points": changed_points, "edges": changed_placement_edges},
+            "routes": changed_routes,
+        })
+        self.__last_exports = dict(exports)
+        if self.__cache:
+            # Later exports of the edited topology are stored under its new hash
+            self.__cache_key = topology_hash(self.topology, self.__generate_routes, self.__generate_vacancy_sections)
+            self.__cached_exports = {
+                "topology_and_routes": {"topology": exports["topology"], "routes": exports["routes"]},
+                "placement": exports["placement"],
             }
-            route_states = []
-            signal_state = self.generate_signal_state(route.start_signal, route.maximum_speed)
-            route_states.append(signal_state)
+            for kind, entry in self.__cached_exports.items():
+                self.__cache.put(f"{self.__cache_key}.{kind}", entry)
+        return delta
+
+    def __elements_of(self, element) -> dict:
+        """The dict of the topology that holds this kind of element"""
+        if isinstance(element, Node):
+            return self.topology.nodes
+        if isinstance(element, Edge):
+            return self.topology.edges
+        if isinstance(element, Signal):
+            return self.topology.signals
+        raise TypeError(f"Cannot add or remove elements of type {type(element).__name__}")
+
+    def __update_routes(self, changed_edges: dict, changed_signals: dict, changed_nodes: dict, generate_routes: bool) -> dict:
+        """Remove the routes that touch changed elements and are no longer valid and add new ones,
+        the latter only with generate_routes. Returns the uuids of all routes touching changed elements,
+        including the removed ones."""
+
+        def touches_changes(route) -> bool:
+            return (
+                route.start_signal.uuid in changed_signals
+                or route.end_signal.uuid in changed_signals
+                or any(
+                    edge.uuid in changed_edges
+                    or edge.node_a.uuid in changed_nodes
+                    or edge.node_b.uuid in changed_nodes
+                    for edge in route.edges
+                )
+            )
+
+        def route_key(route) -> tuple:
+            return (route.start_signal.uuid, route.end_signal.uuid, tuple(edge.uuid for edge in route.edges))
+
+        changed_routes = dict.fromkeys(
+            uuid for uuid, route in self.__routes.items() if touches_changes(route)
+        )
+        if self.__generate_routes and generate_routes:
+            # The route generator works on whole topologies, only take over the routes touching the changes
+            generated = {route_key(route): route for route in self.__run_route_generator_on_copy().values()}
+            existing = {route_key(route) for route in self.__routes.values()}
+            for uuid in changed_routes:
+                if route_key(self.__routes[uuid]) not in generated:
+                    del self.__routes[uuid]
+            for key, route in generated.items():
+                if key not in existing and touches_changes(route):
+                    self.__routes[route.uuid] = route
+                    changed_routes[route.uuid] = None
+        else:
+            for uuid in changed_routes:
+                route = self.__routes[uuid]
+                if (
+                    route.start_signal.uuid not in self.topology.signals
+                    or route.end_signal.uuid not in self.topology.signals
+                    or any(edge.uuid not in self.topology.edges for edge in route.edges)
+                ):
+                    del self.__routes[uuid]
+        return changed_routes
+
+    @property
+    def completed_steps(self) -> frozenset[str]:
+        """The preparation steps that already ran for this topology"""
+        return frozenset(self.__completed_steps)
+
+    def __require(self, *steps: str):
+        """Run the given preparation steps and the steps they depend on, unless they already ran"""
+        with self.__lock:
+            for step in steps:
+                if step in self.__completed_steps:
+                    continue
+                dependencies, run = self.__steps[step]
+                self.__require(*dependencies)
+                with self.__phase(step):
+                    run()
+                self.__completed_steps.add(step)
+
+    def __phase(self, name: str):
+        """Record the with block as a phase of the stats, if there are any"""
+        return self.stats.phase(name) if self.stats else nullcontext()
+
+    def __run_vacancy_section_generator(self):
+        # Topologies that were prepared before are left as they are, so they can be shared between exporters
+        if self.__generate_vacancy_sections and any(
+            getattr(edge, "vacancy_section", None) is None for edge in self.topology.edges.values()
+        ):
+            # The generators are only imported when they run, exporters of prepared topologies never load them
+            from vacancy_section_generator.generator import VacancySectionGenerator
+
+            VacancySectionGenerator(self.topology).generate()
+
+    def __run_route_generator(self):
+        # The exported routes are the existing routes of the topology and the generated ones
+        self.__routes = dict(self.topology.routes)
+        if self.__generate_routes:
+            self.__routes.update(self.__run_route_generator_on_copy())
+
+    def __run_route_generator_on_copy(self) -> dict:
+        """Generate the routes into a copy of the topology that shares its elements, so that the topology
+        itself is not changed. Returns the generated routes by uuid."""
+        from railwayroutegenerator.routegenerator import RouteGenerator
+
+        scratch = Topology()
+        scratch.nodes = self.topology.nodes
+        scratch.edges = self.topology.edges
+        scratch.signals = self.topology.signals
+        RouteGenerator(scratch).generate_routes()
+        return scratch.routes
+
+    def __take_over_orientations(self, previous: GraphIndex, changed_nodes: dict) -> set[int]:
+        """Copy the orientations of the connected components without changed nodes from the previous graph index,
+        orienting them again would give the same result. Returns the indices of the other components."""
+        graph = self.__graph
+        changed_components = set()
+        for component, node_ids in enumerate(graph.components):
+            previous_ids = [previous.node_ids.get(graph.nodes[node_id].uuid) for node_id in node_ids]
+            if None in previous_ids or any(graph.nodes[node_id].uuid in changed_nodes for node_id in node_ids):
+                changed_components.add(component)
+                continue
+            for node_id, previous_id in zip(node_ids, previous_ids):
+                graph.node_orientation[node_id] = previous.node_orientation[previous_id]
+                graph.node_diversion[node_id] = previous.node_diversion[previous_id]
+                if previous.right_edge[previous_id] != NO_ID:
+                    graph.right_edge[node_id] = graph.edge_ids[previous.edges[previous.right_edge[previous_id]].uuid]
+                for edge_id in graph.edges_of(node_id):
+                    previous_edge_id = previous.edge_ids[graph.edges[edge_id].uuid]
+                    graph.edge_orientation[edge_id] = previous.edge_orientation[previous_edge_id]
+            self.__oriented_components.add(component)
+        return changed_components
+
+    def __build_graph_index(self):
+        self.__graph = GraphIndex(self.topology)
+        # The connected components whose nodes and edges are oriented
+        self.__oriented_components = set()
+
+    def __ensure_orientations(self):
+        self.__orient_components(range(len(self.__graph.components)))
+
+    def __orient_components(self, components: Iterable[int]):
+        """Orient the nodes and edges of the given connected components, unless they already are"""
+        for component in components:
+            if component in self.__oriented_components:
+                continue
+            with self.__phase("node_orientations"):
+                self.__ensure_nodes_orientations(component)
+                self.__assign_double_edges(component)
+            with self.__phase("edge_orientations"):
+                self.__ensure_edges_orientations(component)
+            self.__oriented_components.add(component)
+
+    def __is_double_edge_point(self, node: int) -> bool:
+        """Whether the node is a point connected to another point by two edges on its left and right branch"""
+        graph = self.__graph
+        if not graph.is_point[node]:
+            return False
+        edges_left = graph.edges_between(node, graph.left[node])
+        return bool(edges_left) and edges_left == graph.edges_between(node, graph.right[node])
+
+    def __assign_double_edges(self, component: int):
+        """Choose which of the two edges between a pair of points is on the right branch of the point that comes
+        first in topology.nodes. The other point's branches follow from this choice when it is placed, so every
+        placement agrees on them, no matter which points it includes."""
+        graph = self.__graph
+        position = graph.topology_position
+        for node in graph.components[component]:
+            if position[node] == NO_ID or not self.__is_double_edge_point(node):
+                continue
+            other = graph.left[node]
+            if position[other] != NO_ID and position[other] < position[node] and self.__is_double_edge_point(other):
+                continue
+            edges = graph.edges_between(node, other)
+            graph.right_edge[node] = edges[0] if graph.node_diversion[node] == NORMAL else edges[1]
+
+    @property
+    def components(self) -> list[list[str]]:
+        """The uuids of the nodes of each connected component of the topology.
+        The index of a component can be passed to iter_placement()."""
+        self.__require("graph_index")
+        graph = self.__graph
+        return [[graph.nodes[node_id].uuid for node_id in nodes] for nodes in graph.components]
+
+    def export_routes(self, workers: int | None = None) -> list:
+        """Export the routes with the states of their signals, vacancy sections and points.
+        With workers > 1 the routes are split across a pool of that many processes,
+        the result is in the same order as without workers."""
+        with self.__phase("export_routes"):
+            if self.__cache:
+                routes = self.__from_cache("topology_and_routes", lambda: self.__export_topology_and_routes(workers))["routes"]
+            else:
+                routes = self.__export_routes(workers)
+        self.__last_exports["routes"] = routes
+        return routes
+
+    def __export_topology_and_routes(self, workers: int | None = None) -> dict:
+        return {"topology": self.__export_topology(True), "routes": self.__export_routes(workers)}
+
+    def __export_routes(self, workers: int | None) -> list:
+        if workers and workers > 1:
+            from .parallel import export_routes_in_pool
+
+            self.__require("vacancy_sections", "routes")
+            return export_routes_in_pool(self.topology, self.__routes, workers)
+        return list(self.iter_routes())
+
+    def iter_routes(self, route_uuids: Iterable[str] | None = None) -> Iterator[dict]:
+        """Yield the routes of export_routes() one at a time, optionally only the routes with the given uuids"""
+        self.__require("vacancy_sections", "routes", "route_traversals")
+        if route_uuids is None:
+            route_uuids = self.__routes.keys()
+        for route_uuid in route_uuids:
+            yield self.__export_route(route_uuid, self.__routes[route_uuid])
+
+    def export_route_conflicts(self) -> dict:
+        """Export which routes conflict with each other, because they share a trackVacancySection or need a point
+        in different positions. "routes" lists the route uuids in the order of export_routes(), "conflicts" holds
+        for each route the ascending indices of the routes it conflicts with."""
+        with self.__phase("export_route_conflicts"):
+            return self.__export_route_conflicts()
+
+    def __export_route_conflicts(self) -> dict:
+        self.__require("vacancy_sections", "routes", "route_traversals")
+        graph = self.__graph
+        routes = list(self.__routes.values())
+
+        # Each resource (a vacancy section or a point in one position) maps to the bitset of the routes using it
+        routes_per_section = defaultdict(int)
+        routes_per_point = {"left": defaultdict(int), "right": defaultdict(int)}
+        resources_per_route = []
+        for index, route in enumerate(routes):
+            bit = 1 << index
+            sections = {edge.vacancy_section.uuid for edge in route.edges}
+            for section in sections:
+                routes_per_section[section] |= bit
+            point_states = set()
+            previous_node = graph.node_id(route.start_signal.previous_node())
             for edge in route.edges:
-                # export vacancy section
-                vacancy_section = {
-                    "type": "vacancy_section",
-                    "uuid": edge.vacancy_section.uuid,
-                    "state": "free",
-                    "previous_signals": [],
-                }
-                if len(edge.signals) > 0:
-                    try:
-                        sig = next(
-                            (
-                                self.generate_signal_state(sig, route.maximum_speed)
-                                for sig in edge.signals
-                                if sig.kind == SignalKind.Hauptsignal
-                            )
-                        )
-                        vacancy_section["previous_signals"].append(sig)
-                    except StopIteration:
-                        pass
+                previous_node, states = self.__traverse(graph.edge_ids[edge.uuid], previous_node)
+                point_states.update(states)
+            for point_uuid, state in point_states:
+                routes_per_point[state][point_uuid] |= bit
+            resources_per_route.append((sections, point_states))
 
-                    route_states.append(vacancy_section)
+        other_state = {"left": "right", "right": "left"}
+        conflicts = []
+        for index, (sections, point_states) in enumerate(resources_per_route):
+            row = 0
+            for section in sections:
+                row |= routes_per_section[section]
+            for point_uuid, state in point_states:
+                row |= routes_per_point[other_state[state]].get(point_uuid, 0)
+            row &= ~(1 << index)
+            conflicts.append(self.__bit_indices(row))
 
-                # find out which node comes first on the driveway because edges can be oriented both ways
-                if edge.node_a == previous_node:
-                    current_node = edge.node_b
-                else:
-                    current_node = edge.node_a
-                # find out whether the previous point needs to be in a specific position
-                match current_node:
-                    case previous_node.connected_on_left:
-                        route_states.append(
-                            {"uuid": previous_node.uuid, "type": "point", "state": "left"}
-                        )
-                    case previous_node.connected_on_right:
-                        route_states.append(
-                            {"uuid": previous_node.uuid, "type": "point", "state": "right"}
-                        )
-                # find out whether the current point needs to be in a specific position
-                match previous_node:
-                    case current_node.connected_on_left:
-                        route_states.append(
-                            {"uuid": current_node.uuid, "type": "point", "state": "left"}
-                        )
-                    case current_node.connected_on_right:
-                        route_states.append(
-                            {"uuid": current_node.uuid, "type": "point", "state": "right"}
+        return {"routes": [route.uuid for route in routes], "conflicts": conflicts}
+
+    @staticmethod
+    def __bit_indices(bits: int) -> list[int]:
+        indices = []
+        while bits:
+            lowest = bits & -bits
+            indices.append(lowest.bit_length() - 1)
+            bits ^= lowest
+        return indices
+
+    def __build_route_traversals(self):
+        """Set up the table holding for each edge and both directions the node it leads to and the point states
+        needed to pass it. The traversal of edge e from its node_a is at index 2 * e, the one from its node_b
+        at 2 * e + 1. Routes share most of their edges, so each entry is computed when it is first needed."""
+        self.__route_traversals = [None] * (2 * len(self.__graph.edges))
+
+    def __point_states(self, previous_node: int, current_node: int) -> tuple[tuple[str, str], ...]:
+        """The (point uuid, state) pairs needed to go from one node to the next"""
+        graph = self.__graph
+        states = []
+        # find out whether the previous point needs to be in a specific position
+        if current_node == graph.left[previous_node]:
+            states.append((graph.nodes[previous_node].uuid, "left"))
+        elif current_node == graph.right[previous_node]:
+            states.append((graph.nodes[previous_node].uuid, "right"))
+        # find out whether the current point needs to be in a specific position
+        if previous_node == graph.left[current_node]:
+            states.append((graph.nodes[current_node].uuid, "left"))
+        elif previous_node == graph.right[current_node]:
+            states.append((graph.nodes[current_node].uuid, "right"))
+        return tuple(states)
+
+    def __traverse(self, edge_id: int, previous_node: int) -> tuple[int, tuple[tuple[str, str], ...]]:
+        """The node reached by passing the edge coming from the previous node and the point states needed for it"""
+        node_a, node_b = self.__graph.edge_nodes_of(edge_id)
+        if previous_node == node_a:
+            index, current_node = 2 * edge_id, node_b
+        elif previous_node == node_b:
+            index, current_node = 2 * edge_id + 1, node_a
+        else:
+            # The route does not continue at one of the edge's nodes, go on at node_a
+            return node_a, self.__point_states(previous_node, node_a)
+        traversal = self.__route_traversals[index]
+        if traversal is None:
+            traversal = self.__route_traversals[index] = (current_node, self.__point_states(previous_node, current_node))
+        return traversal
+
+    def __export_route(self, route_uuid: str, route) -> dict:
+        if self.stats:
+            self.stats.count("routes_exported")
+            self.stats.count("route_traversal_steps", len(route.edges))
+        graph = self.__graph
+        previous_node = graph.node_id(route.start_signal.previous_node())
+        route_json = {
+            "start_signal": self.generate_signal_state(route.start_signal, route.maximum_speed),
+            "end_signal": self.generate_signal_state(route.end_signal, route.maximum_speed),
+            "uuid": route_uuid
+        }
+        route_states = []
+        signal_state = self.generate_signal_state(route.start_signal, route.maximum_speed)
+        route_states.append(signal_state)
+        for edge in route.edges:
+            # export vacancy section
+            vacancy_section = {
+                "type": "vacancy_section",
+                "uuid": edge.vacancy_section.uuid,
+                "state": "free",
+                "previous_signals": [],
+            }
+            if len(edge.signals) > 0:
+                try:
+                    sig = next(
+                        (
+                            self.generate_signal_state(sig, route.maximum_speed)
+                            for sig in edge.signals
+                            if sig.kind == SignalKind.Hauptsignal
                         )
-                previous_node = current_node
-            route_json["states"] = route_states
-            output.append(route_json)
-        return output
+                    )
+                    vacancy_section["previous_signals"].append(sig)
+                except StopIteration:
+                    pass
+
+                route_states.append(vacancy_section)
+
+            # find out which node comes first on the driveway because edges can be oriented both ways,
+            # and which points need to be in a specific position
+            current_node, point_states = self.__traverse(graph.edge_ids[edge.uuid], previous_node)
+            route_states += [
+                {"uuid": point_uuid, "type": "point", "state": state} for point_uuid, state in point_states
+            ]
+            previous_node = current_node
+        route_json["states"] = route_states
+        return route_json
 
     
     def __add_axleCountingHeads_and_vacancySections(self):
-        """This adds axleCountingHeads and trackVacancySections to the Topology, since they are needed the export."""
-        axleCountingHeads = {}
-        trackVacancySections = {}
-        for id, edge in self.topology.edges.items():
+        """This creates the axleCountingHeads and trackVacancySections of the Topology, since they are needed the export.
+        Both are kept as records, the heads per edge and ordered by their position on the edge."""
+        self.__trackVacancySections = {}
+        self.__axleCountingHeads_per_edge = {}
+        # vacancy section uuid -> uuids of the edges in it, the last one provides its trackVacancySection
+        self.__vacancySection_edges = {}
+        self.__update_axleCountingHeads_and_vacancySections(self.topology.edges.keys())
+
+    def __update_axleCountingHeads_and_vacancySections(self, edge_uuids: Iterable[str]) -> dict:
+        """(Re)create the axleCountingHeads and trackVacancySections of the given edges.
+        Those of edges that are no longer part of the topology are removed.
+        Returns the uuids of the updated trackVacancySections, including the removed ones."""
+        trackVacancySections = self.__trackVacancySections
+        # Used as an ordered set, to keep the order of the trackVacancySections stable
+        updated_vacancy_sections = {}
+
+        for id in edge_uuids:
+            for head in self.__axleCountingHeads_per_edge.pop(id, []):
+                tvs_uuid = head.vacancy_section
+                self.__vacancySection_edges[tvs_uuid].pop(id, None)
+                updated_vacancy_sections[tvs_uuid] = None
+
+            edge = self.topology.edges.get(id)
+            if edge is None:
+                continue
             tvs = edge.vacancy_section
-            axleCountingHeadL = {
-                "edge": id,
-                "id": Node().uuid,
-                "limits": [tvs.uuid],
-                "name": f"{edge.signals[0].name if edge.signals and edge.signals[0].name else id[:8]} / L",
-                "position": 0.1
-            }
-            axleCountingHeadR = {
-                "edge": id,
-                "id": Node().uuid,
-                "limits": [tvs.uuid],
-                "name": f"{edge.signals[-1].name if edge.signals and edge.signals[-1].name else id[:8]} / R",
-                "position": 0.9
-            }
-            axleCountingHeads[axleCountingHeadL.get("id")] = axleCountingHeadL
-            axleCountingHeads[axleCountingHeadR.get("id")] = axleCountingHeadR
-
-            trackVacancySections[tvs.uuid] = {
-                "id": tvs.uuid,
-                "limits": [
-                    axleCountingHeadL.get("id"),
-                    axleCountingHeadR.get("id")
-                ],
-                "name": "DE_AC01",
-                "rastaId": None,
-                "tpsName": id[:8]
-            }
-        self.topology.__dict__["axleCountingHeads"] = axleCountingHeads
-        self.topology.__dict__["trackVacancySections"] = trackVacancySections
-    
-    def export_topology(self) -> dict:
+            axleCountingHeadL = AxleCountingHead(
+                axle_counting_head_id(id, "L"),
+                id,
+                tvs.uuid,
+                f"{edge.signals[0].name if edge.signals and edge.signals[0].name else id[:8]} / L",
+                0.1,
+            )
+            axleCountingHeadR = AxleCountingHead(
+                axle_counting_head_id(id, "R"),
+                id,
+                tvs.uuid,
+                f"{edge.signals[-1].name if edge.signals and edge.signals[-1].name else id[:8]} / R",
+                0.9,
+            )
+            self.__axleCountingHeads_per_edge[id] = sorted(
+                [axleCountingHeadL, axleCountingHeadR], key=lambda head: head.position
+            )
+            self.__vacancySection_edges.setdefault(tvs.uuid, {})[id] = None
+            updated_vacancy_sections[tvs.uuid] = None
+
+        for tvs_uuid in updated_vacancy_sections:
+            edges = self.__vacancySection_edges.get(tvs_uuid)
+            if not edges:
+                self.__vacancySection_edges.pop(tvs_uuid, None)
+                trackVacancySections.pop(tvs_uuid, None)
+                continue
+            id = next(reversed(edges))
+            trackVacancySections[tvs_uuid] = TrackVacancySection(
+                tvs_uuid, tuple(head.id for head in self.__axleCountingHeads_per_edge[id]), id[:8]
+            )
+        return updated_vacancy_sections
+
+    def __iter_trackVacancySections(self) -> Iterator[tuple[str, dict]]:
+        for tvs_uuid, tvs in self.__trackVacancySections.items():
+            yield tvs_uuid, tvs.as_dict()
+
+    def export_topology(self, include_routes = True) -> dict:
         """Export the topology as a dict containing attributes needed by the Interlocking-UI.
-        This can optinally add extra AxleCountingHeads on edges that contain no further items."""
-        edges = {
-            edge.uuid: {
-                "anschlussA": None,
-                "anschlussB": None,
-                "id": edge.uuid,
-                "knotenA": None,
-                "knotenB": None,
-                "laenge": int(edge.length) if edge.length else None,
-            }
-            for edge in self.topology.edges.values()
-        }
+        This can optinally add extra AxleCountingHeads on edges that contain no further items.
+        Without include_routes the routes are neither generated nor exported."""
+        with self.__phase("export_topology"):
+            if self.__cache and include_routes:
+                topology = self.__from_cache("topology_and_routes", self.__export_topology_and_routes)["topology"]
+            elif self.__cache:
+                with self.__lock:
+                    entry = self.__cached("topology_and_routes")
+                if entry is not None:
+                    return {**entry["topology"], "routes": {}}
+                # Not stored, routes exported later by another exporter could refer to other trackVacancySections
+                return self.__export_topology(False)
+            else:
+                topology = self.__export_topology(include_routes)
+        if include_routes:
+            self.__last_exports["topology"] = topology
+        return topology
 
-        signals = {
-            signal.uuid: {
-                "art": str(signal.kind),
-                "edge": signal.edge.uuid,
-                "funktion": str(signal.function),
-                "id": signal.uuid,
-                "name": signal.name or "",
-                "offset": signal.distance_edge,
-                "rastaId": 1234567890,
-                "wirkrichtung": "normal"
-                if signal.direction == SignalDirection.IN
-                else "reverse",
-            }
+    def __export_topology(self, include_routes: bool) -> dict:
+        return {section: dict(entries) for section, entries in self.iter_topology(include_routes)}
+
+    def iter_topology(self, include_routes = True) -> Iterator[tuple[str, Iterator[tuple[str, dict]]]]:
+        """Yield the sections of export_topology() in order, each as a name and an iterator over its (id, entry) pairs.
+        The entries are only created while iterating over them."""
+        self.__require("graph_index", "axle_counting_heads")
+        if include_routes:
+            self.__require("routes")
+
+        yield "edges", (
+            (edge.uuid, self.__topology_edge(edge)) for edge in self.topology.edges.values()
+        )
+
+        yield "nodes", self.__iter_topology_nodes()
+
+        yield "points", (
+            (point.uuid, self.__topology_point(point))
+            for point in self.topology.nodes.values()
+            if self.__is_topology_point(point)
+        )
+
+        yield "signals", (
+            (signal.uuid, self.__topology_signal(signal))
             for signal in self.topology.signals.values()
             if self.__is_signal(signal)
+        )
+
+        yield "axleCountingHeads", (
+            (head.id, head.as_dict())
+            for heads in self.__axleCountingHeads_per_edge.values()
+            for head in heads
+        )
+
+        yield "routes", (
+            (route.uuid, self.__topology_route(route)) for route in self.__routes.values()
+        ) if include_routes else iter(())
+
+        yield "trackVacancySections", self.__iter_trackVacancySections()
+
+    def __topology_edge(self, edge: Edge) -> dict:
+        return {
+            "anschlussA": None,
+            "anschlussB": None,
+            "id": edge.uuid,
+            "knotenA": None,
+            "knotenB": None,
+            "laenge": int(edge.length) if edge.length else None,
         }
 
-        points = {
-            point.uuid: {
-                "id": point.uuid,
-                "name": point.name or "",
-                "node": "",
-                "rastaId": None,
-            }
-            for point in self.topology.nodes.values()
-            if None
-            not in [
-                point.connected_on_head,
-                point.connected_on_left,
-                point.connected_on_right,
-            ]
+    def __is_topology_point(self, node: Node) -> bool:
+        return None not in [
+            node.connected_on_head,
+            node.connected_on_left,
+            node.connected_on_right,
+        ]
+
+    def __topology_point(self, point: Node) -> dict:
+        return {
+            "id": point.uuid,
+            "name": point.name or "",
+            "node": "",
+            "rastaId": None,
         }
 
-        # Find node ids by concatenating edge ids for each node that connects them
-        edges_per_node = self.__group_edges_per_node(self.topology.edges.values())
-        edge_combinations = []
-        for _edges in edges_per_node.values():
-            if len(_edges) > 1:
-                for i, _ in enumerate(_edges):
-                    for j in range(i + 1, len(_edges)):
-                        edge_combinations.append(f"{_edges[i].uuid}.{_edges[j].uuid}")
-        nodes = {
-            edge_combination: {"id": edge_combination}
-            for edge_combination in edge_combinations
+    def __topology_signal(self, signal: Signal) -> dict:
+        return {
+            "art": str(signal.kind),
+            "edge": signal.edge.uuid,
+            "funktion": str(signal.function),
+            "id": signal.uuid,
+            "name": signal.name or "",
+            "offset": signal.distance_edge,
+            "rastaId": 1234567890,
+            "wirkrichtung": "normal"
+            if signal.direction == SignalDirection.IN
+            else "reverse",
         }
 
+    def __iter_topology_nodes(self) -> Iterator[tuple[str, dict]]:
+        graph = self.__graph
+        for node_id in range(len(graph.nodes)):
+            yield from self.__topology_node_entries(graph, node_id)
+
+    @staticmethod
+    def __topology_node_entries(graph: GraphIndex, node_id: int) -> Iterator[tuple[str, dict]]:
+        # Find node ids by concatenating edge ids for each node that connects them
+        _edges = graph.edges_of(node_id)
+        if len(_edges) > 1:
+            for i, _ in enumerate(_edges):
+                for j in range(i + 1, len(_edges)):
+                    edge_combination = f"{graph.edges[_edges[i]].uuid}.{graph.edges[_edges[j]].uuid}"
+                    yield edge_combination, {"id": edge_combination}
+
+    def __topology_route(self, route) -> dict:
         def flatten(l):
             return [item for sublist in l for item in sublist]
 
-        routes = {}
-        for route in self.topology.routes.values():
-            route_points = set(flatten([[edge.node_a.uuid, edge.node_b.uuid] for edge in list(route.edges)]))
-            not_points = {point_id for point_id in route_points if not self.__is_point(self.topology.nodes[point_id])}
-            route_points = list(route_points.difference(not_points))
-            routes[route.uuid] = {
-                "id": route.uuid,
-			    "start": route.start_signal.uuid,
-                "end": route.end_signal.uuid,
-                "points": route_points,
-			    "tvps": [edge.vacancy_section.uuid for edge in route.edges]
-            }
-
-        axleCountingHeads = self.topology.__dict__["axleCountingHeads"] 
-        trackVacancySections = self.topology.__dict__["trackVacancySections"] 
+        graph = self.__graph
+        # Keep the points in the order they are passed, so that repeated exports are identical
+        edge_ids = [graph.edge_ids[edge.uuid] for edge in route.edges]
+        route_points = dict.fromkeys(flatten([graph.edge_nodes_of(edge_id) for edge_id in edge_ids]))
+        route_points = [graph.nodes[node_id].uuid for node_id in route_points if graph.is_point[node_id]]
         return {
-            "edges": edges,
-            "nodes": nodes,
-            "points": points,
-            "signals": signals,
-            "axleCountingHeads": axleCountingHeads,
-            "routes": routes,
-            "trackVacancySections": trackVacancySections,
+            "id": route.uuid,
+            "start": route.start_signal.uuid,
+            "end": route.end_signal.uuid,
+            "points": route_points,
+            "tvps": [edge.vacancy_section.uuid for edge in route.edges]
         }
 
-    def export_placement(self) -> dict:
-        """Export the placement of points and edges as a dict containing attributes needed by the Interlocking-UI"""
-        if not self.topology.__dict__.get("axleCountingHeads"):
-            raise Exception("There are no axleCountingHeads in the topology. Try to run export_topology() first.")
-        points = {}
-        visited_edges = self.__map_connected_nodes_to_edge(self.topology.edges.values())
-        get_edges_from_nodes = lambda a, b: visited_edges.get((a, b))
+    def export_placement(self, workers: int | None = None) -> dict:
+        """Export the placement of points and edges as a dict containing attributes needed by the Interlocking-UI.
+        With workers > 1 the connected components of the topology are placed by a pool of that many processes,
+        the result is the same as without workers."""
+        with self.__phase("export_placement"):
+            if self.__cache:
+                placement = self.__from_cache("placement", lambda: self.__export_placement(workers))
+            else:
+                placement = self.__export_placement(workers)
+        self.__last_exports["placement"] = placement
+        return placement
+
+    def __export_placement(self, workers: int | None) -> dict:
+        if workers and workers > 1:
+            from .parallel import export_placement_in_pool
+
+            self.__require("vacancy_sections", "graph_index")
+            return export_placement_in_pool(self.topology, self.__graph.components, workers)
+        return {section: dict(entries) for section, entries in self.iter_placement()}
+
+    def iter_placement(self, components: Iterable[int] | None = None) -> Iterator[tuple[str, Iterator[tuple[str, dict]]]]:
+        """Yield the sections of export_placement() in order, each as a name and an iterator over its (id, entry) pairs.
+        The entries are only created while iterating over them.
+        With components, only the points and edges of the connected components with these indices are placed."""
+        self.__require("graph_index", "axle_counting_heads")
+        graph = self.__graph
+        node_ids = [graph.node_ids[uuid] for uuid in self.topology.nodes]
+        edge_ids = range(len(graph.edges))
+        if components is None:
+            self.__require("orientations")
+        else:
+            components = set(components)
+            with self.__lock:
+                self.__orient_components(components)
+            node_ids = [node_id for node_id in node_ids if graph.component_of[node_id] in components]
+            edge_ids = [edge_id for edge_id in edge_ids if graph.component_of[graph.edge_node_a[edge_id]] in components]
+        yield "points", self.__iter_placement_points(node_ids)
+        yield "edges", self.__iter_placement_edges(edge_ids)
+
+    def __iter_placement_points(self, node_ids: Iterable[int]) -> Iterator[tuple[str, dict]]:
+        graph = self.__graph
+        edges_between = graph.edges_between
+        orientations = graph.node_orientation
+        diversions = graph.node_diversion
 
         # Determine for each point the connected edges and to which branch the connect to
-        for node in self.topology.nodes.values():
-            if not self.__is_point(node):
+        for node in node_ids:
+            if not graph.is_point[node]:
                 continue
+            head, left, right = graph.head[node], graph.left[node], graph.right[node]
 
-            edges_right = get_edges_from_nodes(node, node.connected_on_right)
-            edges_left = get_edges_from_nodes(node, node.connected_on_left)
+            edges_right = edges_between(node, right)
+            edges_left = edges_between(node, left)
 
             # We found two points being connected by two edges
             if edges_right and edges_left and edges_right == edges_left:
-                # We already connected them once
-                other_nodes_right_edge = None
-                if node.connected_on_left.__dict__.get("right_edge"):
-                    # Assign edges to match previous assignment
-                    other_nodes_right_edge = node.connected_on_left.__dict__.get(
-                        "right_edge"
-                    )
+                # The other point's edges were assigned when orienting them
+                other_nodes_right_edge = graph.right_edge[left]
+                if other_nodes_right_edge != NO_ID:
+                    # Assign edges to match the other point
                     other_nodes_left_edge = (
                         edges_right[0]
                         if edges_right[0] != other_nodes_right_edge
@@ -241,84 +883,41 @@ class Exporter:
 
                     diverting = (
                         other_nodes_right_edge
-                        if node.__dict__.get("orientation") == "Left"
+                        if orientations[node] == LEFT
                         else other_nodes_left_edge
                     )
                     through = (
                         other_nodes_right_edge
-                        if node.__dict__.get("orientation") == "Right"
+                        if orientations[node] == RIGHT
                         else other_nodes_left_edge
                     )
-                # We see them the first time
+                # This point comes first, its right edge follows the same choice
                 else:
-                    # Choose randomly
                     diverting = edges_left[0]
                     through = edges_left[1]
-
-                    node.__dict__["right_edge"] = (
-                        diverting
-                        if node.__dict__.get("divertsInDirection") == "normal"
-                        else through
-                    )
             else:
                 # There are different edges and they are only singular
-                diverting = (
-                    get_edges_from_nodes(node, node.connected_on_left)[0]
-                    if node.__dict__.get("orientation") == "Left"
-                    else get_edges_from_nodes(node, node.connected_on_right)[0]
-                )
-                through = (
-                    get_edges_from_nodes(node, node.connected_on_right)[0]
-                    if node.__dict__.get("orientation") == "Left"
-                    else get_edges_from_nodes(node, node.connected_on_left)[0]
-                )
+                diverting = edges_left[0] if orientations[node] == LEFT else edges_right[0]
+                through = edges_right[0] if orientations[node] == LEFT else edges_left[0]
 
             point = {
-                "toe": get_edges_from_nodes(node, node.connected_on_head)[0]
-                if node.connected_on_head
+                "toe": graph.edges[edges_between(node, head)[0]].uuid
+                if head != NO_ID
                 else "",
-                "diverting": diverting,
-                "through": through,
-                "divertsInDirection": node.__dict__.get("divertsInDirection"),
-                "orientation": node.__dict__.get("orientation"),
+                "diverting": graph.edges[diverting].uuid,
+                "through": graph.edges[through].uuid,
+                "divertsInDirection": CODE_NAMES[diversions[node]],
+                "orientation": CODE_NAMES[orientations[node]],
             }
-            points[node.uuid] = point
-
-        edges_per_node = self.__group_edges_per_node(self.topology.edges.values())
-
-        def __set_edge_orientation(edge: Edge, previous_node: Node, orientation: str):
-            if edge.__dict__.get("orientation"):
-                return
-            edge.__dict__["orientation"] = orientation
-
-            next_node = edge.node_a if previous_node != edge.node_a else edge.node_b
-            next_edges = [_edge for _edge in edges_per_node[next_node.uuid] if _edge != edge]
-
-            for next_edge in next_edges:
-                double_edge = next_edge.node_a in [edge.node_a, edge.node_b] and next_edge.node_b in [edge.node_a, edge.node_b] 
-                flip = True if (next_node != next_edge.node_a and not double_edge) or (next_node == next_edge.node_a and double_edge) else False
-                next_orientation = "normal" if (orientation == "normal" and not flip) or (orientation == "reverse" and flip) else "reverse"
-
-                __set_edge_orientation(next_edge, next_node, next_orientation)
+            yield graph.nodes[node].uuid, point
 
-        edges_per_nodes_length = {
-            node: len(items) for node, items in edges_per_node.items()
-        }
-
-        start_node = self.topology.nodes.get(
-            min(edges_per_nodes_length, key=edges_per_nodes_length.get)
-        )
-        start_edge = edges_per_node[start_node.uuid][0]
-
-        # start_orientation = "normal" if start_edge.node_a == start_node else "reverse"
-        start_orientation = "normal"
-        __set_edge_orientation(start_edge, start_node, start_orientation)
-
-        edges = {}
-        for edge in self.topology.edges.values():
-            axleCountingHeads = [head for head in self.topology.__dict__.get("axleCountingHeads").values() if head.get("edge") == edge.uuid]
-            items = [edge.node_a.uuid] if self.__is_point(edge.node_a) else []
-            items += [axleCountingHeads[0].get("id")] if axleCountingHeads[0].get("position") < 0.5 else [axleCountingHeads[1].get("id")]
+    def __iter_placement_edges(self, edge_ids: Iterable[int]) -> Iterator[tuple[str, dict]]:
+        graph = self.__graph
+        for edge_id in edge_ids:
+            edge = graph.edges[edge_id]
+            axleCountingHeads = self.__axleCountingHeads_per_edge[edge.uuid]
+            items = [edge.node_a.uuid] if graph.is_point[graph.edge_node_a[edge_id]] else []
+            items += [axleCountingHeads[0].id] if axleCountingHeads[0].position < 0.5 else [axleCountingHeads[1].id]
             items += (
                 [
                     signal.uuid
@@ -328,211 +927,411 @@ class Exporter:
                 if len(edge.signals) > 0
                 else []
             )
-            items += [axleCountingHeads[0].get("id")] if axleCountingHeads[1].get("position") < 0.5 else [axleCountingHeads[1].get("id")]
-            items += [edge.node_b.uuid] if self.__is_point(edge.node_b) else []
-            edges[edge.uuid] = {"items": items, "orientation": edge.__dict__.get("orientation")}
-
-        return {"points": points, "edges": edges}
-
-    def __ensure_nodes_orientations(self):
-        """Make sure that each node has the attributes 'orientation' and 'divertsInDirection' set correctly"""
-        # Find nodes that mark topology ends
-        visited_nodes = self.__group_edges_per_node(self.topology.edges.values())
-        visited_nodes_length = {
-            node: len(items) for node, items in visited_nodes.items()
+            items += [axleCountingHeads[0].id] if axleCountingHeads[1].position < 0.5 else [axleCountingHeads[1].id]
+            items += [edge.node_b.uuid] if graph.is_point[graph.edge_node_b[edge_id]] else []
+            yield edge.uuid, {"items": items, "orientation": CODE_NAMES[graph.edge_orientation[edge_id]]}
+
+    def export_subgraph(
+        self,
+        edges: Iterable[str] | None = None,
+        nodes: Iterable[str] | None = None,
+        bbox: tuple[float, float, float, float] | None = None,
+    ) -> dict:
+        """Export the part of the topology a viewport shows, in the format of the topology, placement and routes exports.
+
+        The slice holds the given edges, the edges between the given nodes and the edges between the nodes inside
+        bbox, a (min_x, min_y, max_x, max_y) box over the coordinates of the nodes' geo_node. Its nodes are those
+        the edges connect and the given ones. Only signals, axleCountingHeads and points of the slice are exported,
+        trackVacancySections and routes only if all of their edges are part of the slice.
+        Edges leaving the slice are listed in "boundary" with the uuids of their nodes inside the slice.
+
+        The slice is found with indexes built on first use, so that a query takes time in proportion to its size.
+        Only orienting the connected components of the slice for the first time takes longer."""
+        with self.__phase("export_subgraph"):
+            self.__require("graph_index", "axle_counting_heads", "route_index", "route_traversals")
+            graph = self.__graph
+            slice_nodes = set()
+            slice_edges = set()
+            if edges is not None:
+                for uuid in edges:
+                    edge_id = graph.edge_ids[uuid]
+                    slice_edges.add(edge_id)
+                    slice_nodes.update(graph.edge_nodes_of(edge_id))
+            selected_nodes = set()
+            if nodes is not None:
+                selected_nodes.update(graph.node_ids[uuid] for uuid in nodes)
+            if bbox is not None:
+                self.__require("spatial_index")
+                selected_nodes.update(self.__spatial_index.query(*bbox))
+            for node_id in selected_nodes:
+                for edge_id in graph.edges_of(node_id):
+                    if graph.other_node(edge_id, node_id) in selected_nodes:
+                        slice_edges.add(edge_id)
+            slice_nodes |= selected_nodes
+            slice_nodes = sorted(slice_nodes)
+            slice_edges = sorted(slice_edges)
+
+            # Orienting writes the orientation columns, which other threads may read or write at the same time
+            with self.__lock:
+                self.__orient_components({graph.component_of[node_id] for node_id in slice_nodes} - {NO_ID})
+            return {
+                "topology": self.__subgraph_topology(slice_nodes, slice_edges),
+                "placement": {
+                    # Like export_placement(), only place the points of topology.nodes
+                    "points": dict(self.__iter_placement_points(
+                        node_id for node_id in slice_nodes if graph.topology_position[node_id] != NO_ID
+                    )),
+                    "edges": dict(self.__iter_placement_edges(slice_edges)),
+                },
+                "routes": [
+                    self.__export_route(route.uuid, route) for route in self.__routes_inside(slice_edges)
+                ],
+                "boundary": self.__subgraph_boundary(slice_nodes, slice_edges),
+            }
+
+    def __subgraph_topology(self, node_ids: list[int], edge_ids: list[int]) -> dict:
+        graph = self.__graph
+        edges = [graph.edges[edge_id] for edge_id in edge_ids]
+        edge_uuids = {edge.uuid for edge in edges}
+        inside = set(edge_ids)
+        nodes = {}
+        points = {}
+        for node_id in node_ids:
+            _edges = [edge_id for edge_id in graph.edges_of(node_id) if edge_id in inside]
+            for i, _ in enumerate(_edges):
+                for j in range(i + 1, len(_edges)):
+                    edge_combination = f"{graph.edges[_edges[i]].uuid}.{graph.edges[_edges[j]].uuid}"
+                    nodes[edge_combination] = {"id": edge_combination}
+            node = graph.nodes[node_id]
+            if node.uuid in self.topology.nodes and self.__is_topology_point(node):
+                points[node.uuid] = self.__topology_point(node)
+
+        # A trackVacancySection is in the slice if all of its edges are
+        vacancy_sections = dict.fromkeys(
+            head.vacancy_section for edge in edges for head in self.__axleCountingHeads_per_edge[edge.uuid]
+        )
+        return {
+            "edges": {edge.uuid: self.__topology_edge(edge) for edge in edges},
+            "nodes": nodes,
+            "points": points,
+            "signals": {
+                signal.uuid: self.__topology_signal(signal)
+                for edge in edges
+                for signal in edge.signals
+                if self.__is_signal(signal)
+            },
+            "axleCountingHeads": {
+                head.id: head.as_dict() for edge in edges for head in self.__axleCountingHeads_per_edge[edge.uuid]
+            },
+            "routes": {route.uuid: self.__topology_route(route) for route in self.__routes_inside(edge_ids)},
+            "trackVacancySections": {
+                tvs_uuid: self.__trackVacancySections[tvs_uuid].as_dict()
+                for tvs_uuid in vacancy_sections
+                if all(uuid in edge_uuids for uuid in self.__vacancySection_edges[tvs_uuid])
+            },
         }
 
-        # Use one of the ends as start for a graph traversal
-        start_node = self.topology.nodes.get(
-            min(visited_nodes_length, key=visited_nodes_length.get)
+    def __subgraph_boundary(self, node_ids: list[int], edge_ids: list[int]) -> dict:
+        """The edges of the nodes that are not part of the slice, with their nodes inside it"""
+        graph = self.__graph
+        inside = set(edge_ids)
+        boundary = {}
+        for node_id in node_ids:
+            for edge_id in graph.edges_of(node_id):
+                if edge_id in inside:
+                    continue
+                uuid = graph.edges[edge_id].uuid
+                boundary.setdefault(uuid, {"id": uuid, "nodes": []})["nodes"].append(graph.nodes[node_id].uuid)
+        return boundary
+
+    def __routes_inside(self, edge_ids: list[int]) -> list:
+        """The routes all of whose edges are among the given ones, in the order of export_routes()"""
+        inside = set(edge_ids)
+        candidates = {index for edge_id in edge_ids for index in self.__route_index[edge_id]}
+        routes = [self.__route_list[index] for index in sorted(candidates)]
+        edge_ids_of = self.__graph.edge_ids
+        return [route for route in routes if all(edge_ids_of[edge.uuid] in inside for edge in route.edges)]
+
+    def __build_spatial_index(self):
+        """Index the nodes with coordinates by their position"""
+        graph = self.__graph
+        self.__spatial_index = GridIndex(
+            (node_id, node.geo_node.x, node.geo_node.y)
+            for node_id, node in enumerate(graph.nodes)
+            if getattr(node, "geo_node", None) is not None
         )
 
+    def __build_route_index(self):
+        """Index the routes by the ids of their edges, each route is referred to by its position in the routes"""
+        graph = self.__graph
+        self.__route_list = list(self.__routes.values())
+        self.__route_index = [[] for _ in graph.edges]
+        for index, route in enumerate(self.__route_list):
+            for edge_id in dict.fromkeys(graph.edge_ids[edge.uuid] for edge in route.edges):
+                self.__route_index[edge_id].append(index)
+
+    def __ensure_edges_orientations(self, component: int):
+        """Make sure that each edge of the component has an orientation"""
+        graph = self.__graph
+        edge_orientation = graph.edge_orientation
+
+        def __set_edge_orientation(start_edge: int, start_node: int, start_orientation: int):
+            # Depth-first traversal with an explicit stack, the next edges are pushed in reverse
+            # so that they are visited in the same order as a recursive traversal would.
+            stack = [(start_edge, start_node, start_orientation)]
+            steps = 0
+            while stack:
+                steps += 1
+                edge_id, previous_node, orientation = stack.pop()
+                if edge_orientation[edge_id]:
+                    continue
+                edge_orientation[edge_id] = orientation
+
+                node_a, node_b = graph.edge_nodes_of(edge_id)
+                next_node = graph.other_node(edge_id, previous_node)
+                next_edges = [_edge for _edge in graph.edges_of(next_node) if _edge != edge_id]
+
+                for next_edge in reversed(next_edges):
+                    next_node_a, next_node_b = graph.edge_nodes_of(next_edge)
+                    double_edge = next_node_a in (node_a, node_b) and next_node_b in (node_a, node_b)
+                    flip = True if (next_node != next_node_a and not double_edge) or (next_node == next_node_a and double_edge) else False
+                    next_orientation = NORMAL if (orientation == NORMAL and not flip) or (orientation == REVERSE and flip) else REVERSE
+
+                    stack.append((next_edge, next_node, next_orientation))
+            if self.stats:
+                self.stats.count("edge_orientation_steps", steps)
+
+        start_node = graph.min_degree_node(component)
+        start_edge = graph.edges_of(start_node)[0]
+
+        # start_orientation = "normal" if start_edge.node_a == start_node else "reverse"
+        start_orientation = NORMAL
+        __set_edge_orientation(start_edge, start_node, start_orientation)
+
+    def __ensure_nodes_orientations(self, component: int):
+        """Make sure that each node of the component has an orientation and divertsInDirection set correctly"""
+        graph = self.__graph
+        # Use one of the nodes that mark the ends of the component as start for a graph traversal
+        start_node = graph.nodes[graph.min_degree_node(component)]
+        if not start_node.connected_nodes:
+            return
+        start_node = graph.node_id(start_node)
+        first_node = graph.node_id(graph.nodes[start_node].connected_nodes[0])
+
         # We assume that we start going from left to right
         start_diversion_direction = (
-            "normal"
-            if start_node.connected_nodes[0].connected_on_head == start_node
-            else "reverse"
+            NORMAL
+            if graph.head[first_node] == start_node
+            else REVERSE
         )
 
         # We assume that we start going from left to right
         start_orientation = (
-            "Left"
-            if start_diversion_direction == "normal"
-            else "Right"
+            LEFT
+            if start_diversion_direction == NORMAL
+            else RIGHT
         )
 
         self.__set_node_orientation_and_diversion(
-            start_node.connected_nodes[0], start_orientation, start_diversion_direction
+            first_node, start_orientation, start_diversion_direction
         )
 
-    def __group_edges_per_node(self, edges: list[Edge]) -> dict[Node, list[Edge]]:
-        """For each node list the edges it is part of"""
-        visited_nodes = {}
-        for edge in edges:
-            for node in [edge.node_a, edge.node_b]:
-                uuid = node.uuid
-                if visited_nodes.get(uuid):
-                    visited_nodes.get(uuid).append(edge)
-                else:
-                    visited_nodes[uuid] = [edge]
-        return visited_nodes
-
     def __set_node_orientation_and_diversion(
-        self, node: Node, orientation: str, divertsInDirection: str
+        self, node: int, orientation: int, divertsInDirection: int
+    ):
+        """Set the orientation and diversion direction for each node reachable from the given node.
+        The traversal keeps its own stack of pending nodes, so it does not depend on the recursion limit.
+        """
+        stack = [self.__node_orientation_and_diversion_steps(node, orientation, divertsInDirection)]
+        steps = 1
+        while stack:
+            try:
+                stack.append(self.__node_orientation_and_diversion_steps(*next(stack[-1])))
+                steps += 1
+            except StopIteration:
+                stack.pop()
+        if self.stats:
+            self.stats.count("node_orientation_steps", steps)
+
+    def __node_orientation_and_diversion_steps(
+        self, node: int, orientation: int, divertsInDirection: int
     ):
-        """ "Set each the orientaiton and diversion direction for each node based on the topology"""
+        """Set the orientation and diversion direction for a single node based on the topology.
+        Yields the arguments for each connected node that has to be visited next, in depth-first order."""
+        graph = self.__graph
+        head, left, right = graph.head, graph.left, graph.right
         if orientation:
-            setattr(node, "orientation", orientation)
+            graph.node_orientation[node] = orientation
         if divertsInDirection:
-            setattr(node, "divertsInDirection", divertsInDirection)
+            graph.node_diversion[node] = divertsInDirection
 
         # Try to go in a straight line first, to ensure an orientation for all those nodes,
         # which can than be used to find an orientation for all the diverting ones.
-        next_node_order = [node.connected_on_head] if node.connected_on_head else []
-        if orientation == "Left":
-            if node.connected_on_right:
-                next_node_order.append(node.connected_on_right)
-            if node.connected_on_left:
-                next_node_order.append(node.connected_on_left)
+        next_node_order = [head[node]] if head[node] != NO_ID else []
+        if orientation == LEFT:
+            if right[node] != NO_ID:
+                next_node_order.append(right[node])
+            if left[node] != NO_ID:
+                next_node_order.append(left[node])
         else:
-            if node.connected_on_left:
-                next_node_order.append(node.connected_on_left)
-            if node.connected_on_right:
-                next_node_order.append(node.connected_on_right)
+            if left[node] != NO_ID:
+                next_node_order.append(left[node])
+            if right[node] != NO_ID:
+                next_node_order.append(right[node])
 
         for connected_node in next_node_order:
             # Set divertionDirection
-            if not connected_node.__dict__.get("divertsInDirection"):
+            if not graph.node_diversion[connected_node]:
                 next_node_diverting_direction = divertsInDirection
 
                 if (
-                    connected_node.connected_on_head == node
-                    and node.connected_on_head == connected_node
+                    head[connected_node] == node
+                    and head[node] == connected_node
                 ) or (
-                    connected_node.connected_on_head != node
-                    and node.connected_on_head != connected_node
+                    head[connected_node] != node
+                    and head[node] != connected_node
                 ):
                     next_node_diverting_direction = (
-                        "reverse" if divertsInDirection == "normal" else "normal"
+                        REVERSE if divertsInDirection == NORMAL else NORMAL
                     )
 
             # Do not overwrite orientation
-            if not connected_node.__dict__.get("orientation"):
-                if connected_node.turnout_side:
-                    if connected_node.turnout_side.lower() == "left":
-                        next_node_orientation = "Left"
-                    else:
-                        next_node_orientation = "Right"
-                    self.__set_node_orientation_and_diversion(
+            if not graph.node_orientation[connected_node]:
+                if graph.turnout_side[connected_node]:
+                    next_node_orientation = graph.turnout_side[connected_node]
+                    yield (
                         connected_node,
                         next_node_orientation,
                         next_node_diverting_direction,
                     )
-                next_node_orientation = None
+                next_node_orientation = UNSET
 
-                if connected_node.connected_on_head == node:
+                if head[connected_node] == node:
                     next_node_orientation = (
                         self.__get_node_orientation_based_on_neighbours(connected_node)
                     )
 
-                if next_node_orientation == None:
+                if next_node_orientation == UNSET:
                     if (
-                        connected_node.connected_on_left == node
-                        and node.connected_on_left == connected_node
+                        left[connected_node] == node
+                        and left[node] == connected_node
                     ):
-                        next_node_orientation = "Left"
+                        next_node_orientation = LEFT
                     elif (
-                        connected_node.connected_on_right == node
-                        and node.connected_on_right == connected_node
+                        right[connected_node] == node
+                        and right[node] == connected_node
                     ):
-                        next_node_orientation = "Right"
+                        next_node_orientation = RIGHT
                     elif (
-                        connected_node.connected_on_left == node
-                        and node.connected_on_right == connected_node
+                        left[connected_node] == node
+                        and right[node] == connected_node
                     ):
-                        next_node_orientation = "Right"
+                        next_node_orientation = RIGHT
                     elif (
-                        connected_node.connected_on_right == node
-                        and node.connected_on_left == connected_node
+                        right[connected_node] == node
+                        and left[node] == connected_node
                     ):
-                        next_node_orientation = "Left"
+                        next_node_orientation = LEFT
                     else:
                         # Default
                         next_node_orientation = (
-                            "Left" if orientation == "normal" else "Right"
+                            LEFT if orientation == NORMAL else RIGHT
                         )
 
-                self.__set_node_orientation_and_diversion(
-                    connected_node, next_node_orientation, next_node_diverting_direction
-                )
-
-    def __is_point(self, node: Node):
-        return len(node.connected_nodes) == 3
+                yield connected_node, next_node_orientation, next_node_diverting_direction
 
     def __is_signal(self, signal: Signal):
         return signal.kind == SignalKind.Hauptsignal or signal.kind == SignalKind.Mehrabschnittssignal
 
-    def __get_node_orientation_based_on_neighbours(self, node: Node):
+    def __get_node_orientation_based_on_neighbours(self, node: int) -> int:
         """Try to find the node orientation based on the connection to a neighbour.
         This works for the cases of being connected head-to-head, right-to-right or left-to-left.
         For other cases we cannot give a definitive answer.
         """
-        head = node.connected_on_head
+        graph = self.__graph
+        head = graph.head[node]
         head_connection = (
-            None if not head else self.__get_connection_on_neighbour_node(node, head)
+            UNSET if head == NO_ID else self.__get_connection_on_neighbour_node(node, head)
         )
-        left = node.connected_on_left
+        left = graph.left[node]
         left_connection = (
-            None if not left else self.__get_connection_on_neighbour_node(node, left)
+            UNSET if left == NO_ID else self.__get_connection_on_neighbour_node(node, left)
         )
-        right = node.connected_on_right
+        right = graph.right[node]
         right_connection = (
-            None if not right else self.__get_connection_on_neighbour_node(node, right)
+            UNSET if right == NO_ID else self.__get_connection_on_neighbour_node(node, right)
         )
 
-        if head_connection == "Head":
-            if left_connection == "Left" or "Right":
-                return left_connection
-            if right_connection == "Left" or "Right":
-                return right_connection
+        if head_connection == HEAD:
+            # This used to check `left_connection == "Left" or "Right"`, which always holds
+            return left_connection
         else:
-            if right_connection == "Right":
-                return (
-                    "Right" if right.__dict__.get("orienation") == "Right" else "Left"
-                )
-            if left_connection == "Left":
-                return "Left" if left.__dict__.get("orienation") == "Left" else "Right"
-        return None
+            # These used to compare the neighbour's misspelled "orienation" attribute, which is never set.
+            # The results of that are kept, so that the placement does not change.
+            if right_connection == RIGHT:
+                return LEFT
+            if left_connection == LEFT:
+                return RIGHT
+        return UNSET
 
-    def __get_connection_on_neighbour_node(self, node: Node, neighbour: Node):
+    def __get_connection_on_neighbour_node(self, node: int, neighbour: int) -> int:
         """Get the branch where this node is connected to the neighbour node"""
-        if neighbour.connected_on_head == node:
-            return "Head"
-        if neighbour.connected_on_right == node:
-            return "Right"
-        if neighbour.connected_on_left == node:
-            return "Left"
-        return None
-
-    def __map_connected_nodes_to_edge(self, edges: list[Edge]) -> dict[str, str]:
-        """Create a dict pointing from two node uuids to the edge they connect.
-        Both combinations of node_a and node_b a part of the dict and point to the same edge.
-        """
-        visited_edges = {}
-        for edge in edges:
-            if visited_edges.get((edge.node_a, edge.node_b)):
-                visited_edges.get((edge.node_a, edge.node_b)).append(edge.uuid)
-            else:
-                visited_edges[(edge.node_a, edge.node_b)] = [edge.uuid]
+        graph = self.__graph
+        if graph.head[neighbour] == node:
+            return HEAD
+        if graph.right[neighbour] == node:
+            return RIGHT
+        if graph.left[neighbour] == node:
+            return LEFT
+        return UNSET
 
-            if visited_edges.get((edge.node_b, edge.node_a)):
-                visited_edges.get((edge.node_b, edge.node_a)).append(edge.uuid)
+    def generate_signal_state(self, signal: Signal, max_speed: int | None) -> dict:
+        """Generate the state a signal has to show for a route with the given maximum speed.
+        Results are cached per signal and speed until the signal's states or additional signals change,
+        each call returns its own copy."""
+        key = (signal.uuid, max_speed)
+        fingerprint = self.__signal_fingerprint(signal)
+        with self.__lock:
+            cached = self.__signal_states.get(key)
+            if cached and cached[0] == fingerprint:
+                self.__signal_states.move_to_end(key)
+                signal_state = cached[1]
+                if self.stats:
+                    self.stats.count("signal_state_cache_hits")
             else:
-                visited_edges[(edge.node_b, edge.node_a)] = [edge.uuid]
-        return visited_edges
+                signal_state = self.__generate_signal_state(signal, max_speed)
+                if self.stats:
+                    self.stats.count("signal_states_generated")
+                if self.__signal_state_cache_size > 0:
+                    self.__signal_states[key] = (fingerprint, signal_state)
+                    self.__signal_states.move_to_end(key)
+                    if len(self.__signal_states) > self.__signal_state_cache_size:
+                        self.__signal_states.popitem(last=False)
+
+        return {
+            **signal_state,
+            "supported_states": defaultdict(
+                list,
+                {name: list(states) for name, states in signal_state["supported_states"].items()},
+            ),
+            "state": dict(signal_state["state"]),
+        }
+
+    def __signal_fingerprint(self, signal: Signal) -> tuple:
+        """Everything of a signal that its generated state depends on"""
+        return (
+            signal.name,
+            signal.kind,
+            tuple(signal.supported_states),
+            tuple(
+                (type(add_signal), tuple(add_signal.symbols))
+                for add_signal in signal.additional_signals
+            ),
+        )
+
+    def __generate_signal_state(self, signal: Signal, max_speed: int | None) -> dict:
+        from yaramo.additional_signal import AdditionalSignalZs3, AdditionalSignalZs3v, AdditionalSignalZs2, AdditionalSignalZs2v
 
-    
-    def generate_signal_state(self, signal: Signal, max_speed: int | None) -> dict:
         target_state = {"main": "ks2"}
         supported_states = defaultdict(list)
         supported_states["main"] = [state.name for state in signal.supported_states]
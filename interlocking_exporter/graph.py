@@ -0,0 +1,166 @@
+from array import array
+
+from yaramo.model import Topology, Node, Edge
+
+# Marks a missing node or edge in the id columns
+NO_ID = -1
+
+# Codes of the connection and orientation columns, CODE_NAMES maps them to the names used in the exports
+UNSET = 0
+LEFT = 1
+RIGHT = 2
+HEAD = 3
+NORMAL = 4
+REVERSE = 5
+CODE_NAMES = (None, "Left", "Right", "Head", "normal", "reverse")
+
+
+class GraphIndex:
+    """Adjacency information of a topology, built with a single scan over its edges.
+
+    Nodes and edges are referred to by compact integer ids. Node ids are assigned in the order
+    in which the nodes first appear on the edges, nodes without edges are appended afterwards.
+    Edge ids follow the order of `topology.edges`.
+
+    The adjacency and the attributes of nodes and edges are kept in typed columns (`array`s) indexed by id.
+    The edges of a node are stored in compressed sparse rows: those of node n are
+    `node_edges[node_edge_offsets[n]:node_edge_offsets[n + 1]]`, in ascending id order.
+    The orientation columns are filled by the exporter while it orients the topology.
+
+    The nodes connected by edges are partitioned into connected components, numbered in the order of their
+    smallest node id. Nodes without edges do not belong to any component.
+    """
+
+    def __init__(self, topology: Topology) -> None:
+        self.nodes: list[Node] = []
+        self.node_ids: dict[str, int] = {}
+        self.edges: list[Edge] = list(topology.edges.values())
+        self.edge_ids: dict[str, int] = {}
+        # For each edge the ids of its node_a and node_b
+        self.edge_node_a = array("i")
+        self.edge_node_b = array("i")
+
+        for edge_id, edge in enumerate(self.edges):
+            self.edge_ids[edge.uuid] = edge_id
+            self.edge_node_a.append(self.__add_node(edge.node_a))
+            self.edge_node_b.append(self.__add_node(edge.node_b))
+
+        # For each node its position in topology.nodes, NO_ID for nodes that are only connected to them
+        self.topology_position = array("i")
+        for position, node in enumerate(topology.nodes.values()):
+            node_id = self.__add_node(node)
+            self.topology_position.extend([NO_ID] * (node_id + 1 - len(self.topology_position)))
+            self.topology_position[node_id] = position
+
+        # For each node the ids of the nodes connected on head, left and right, or NO_ID,
+        # and the side of the turnout as LEFT or RIGHT, or UNSET
+        self.head = array("i")
+        self.left = array("i")
+        self.right = array("i")
+        self.turnout_side = array("b")
+        self.is_point = array("b")
+        # Connected nodes are usually part of the topology, others are appended while filling the columns
+        node_id = 0
+        while node_id < len(self.nodes):
+            node = self.nodes[node_id]
+            self.head.append(self.__add_node(node.connected_on_head))
+            self.left.append(self.__add_node(node.connected_on_left))
+            self.right.append(self.__add_node(node.connected_on_right))
+            if node.turnout_side:
+                self.turnout_side.append(LEFT if node.turnout_side.lower() == "left" else RIGHT)
+            else:
+                self.turnout_side.append(UNSET)
+            self.is_point.append(len(node.connected_nodes) == 3)
+            node_id += 1
+        self.topology_position.extend([NO_ID] * (len(self.nodes) - len(self.topology_position)))
+
+        self.degree = array("i", [0]) * len(self.nodes)
+        for node_a, node_b in zip(self.edge_node_a, self.edge_node_b):
+            self.degree[node_a] += 1
+            self.degree[node_b] += 1
+        self.node_edge_offsets = array("i", [0])
+        for degree in self.degree:
+            self.node_edge_offsets.append(self.node_edge_offsets[-1] + degree)
+        self.node_edges = array("i", [0]) * self.node_edge_offsets[-1]
+        filled = self.node_edge_offsets[:-1]
+        for edge_id, (node_a, node_b) in enumerate(zip(self.edge_node_a, self.edge_node_b)):
+            for node_id in (node_a, node_b):
+                self.node_edges[filled[node_id]] = edge_id
+                filled[node_id] += 1
+
+        # Orientation and divertsInDirection of each node, orientation of each edge
+        self.node_orientation = array("b", [UNSET]) * len(self.nodes)
+        self.node_diversion = array("b", [UNSET]) * len(self.nodes)
+        self.edge_orientation = array("b", [UNSET]) * len(self.edges)
+        # For points connected to another point by two edges, the edge on its right branch, or NO_ID.
+        # Only set for the point of each pair that comes first in topology.nodes
+        self.right_edge = array("i", [NO_ID]) * len(self.nodes)
+
+        # For each component the ids of its nodes in ascending order
+        self.components: list[array] = []
+        # For each node the id of its component, NO_ID for nodes without edges
+        self.component_of = array("i", [NO_ID]) * len(self.nodes)
+        self.__find_components()
+
+    def __add_node(self, node: Node | None) -> int:
+        if node is None:
+            return NO_ID
+        node_id = self.node_ids.get(node.uuid)
+        if node_id is None:
+            node_id = len(self.nodes)
+            self.node_ids[node.uuid] = node_id
+            self.nodes.append(node)
+        return node_id
+
+    def __find_components(self) -> None:
+        for start in range(len(self.nodes)):
+            if self.component_of[start] != NO_ID or not self.degree[start]:
+                continue
+            component_id = len(self.components)
+            self.component_of[start] = component_id
+            nodes = []
+            stack = [start]
+            while stack:
+                node_id = stack.pop()
+                nodes.append(node_id)
+                for edge_id in self.edges_of(node_id):
+                    for neighbour in (self.edge_node_a[edge_id], self.edge_node_b[edge_id]):
+                        if self.component_of[neighbour] == NO_ID:
+                            self.component_of[neighbour] = component_id
+                            stack.append(neighbour)
+            self.components.append(array("i", sorted(nodes)))
+
+    def node_id(self, node: Node) -> int:
+        return self.node_ids[node.uuid]
+
+    def edges_of(self, node_id: int) -> array:
+        """The ids of the edges of a node in ascending order"""
+        return self.node_edges[self.node_edge_offsets[node_id]:self.node_edge_offsets[node_id + 1]]
+
+    def edge_nodes_of(self, edge_id: int) -> tuple[int, int]:
+        return self.edge_node_a[edge_id], self.edge_node_b[edge_id]
+
+    def other_node(self, edge_id: int, node_id: int) -> int:
+        """The node at the other end of the edge"""
+        node_a = self.edge_node_a[edge_id]
+        return node_a if node_id != node_a else self.edge_node_b[edge_id]
+
+    def edges_between(self, node_a: int, node_b: int) -> list[int]:
+        """The ids of the edges connecting both nodes in ascending order, in either direction"""
+        if node_a == NO_ID or node_b == NO_ID:
+            return []
+        edge_node_a, edge_node_b = self.edge_node_a, self.edge_node_b
+        return [
+            edge_id
+            for edge_id in self.edges_of(node_a)
+            if (edge_node_b[edge_id] if edge_node_a[edge_id] == node_a else edge_node_a[edge_id]) == node_b
+        ]
+
+    def min_degree_node(self, component: int | None = None) -> int:
+        """Find the id of the first node with the fewest edges, which marks an end of the topology.
+        With a component, only its nodes are considered."""
+        if component is None:
+            candidates = (node_id for node_id in range(len(self.nodes)) if self.degree[node_id] > 0)
+        else:
+            candidates = self.components[component]
+        return min(candidates, key=self.degree.__getitem__)
@@ -0,0 +1,95 @@
+"""Run exports across a pool of worker processes.
+
+The topology is handed to each worker once, when the worker starts. The tasks only carry
+the uuids of the elements a worker should export, or the indices of the connected components
+it should place. The results come back in task order.
+"""
+from concurrent.futures import ProcessPoolExecutor
+import heapq
+
+from yaramo.model import Topology
+
+from .exporter import Exporter
+
+# The exporter of the current worker process, set up by the pool initializer
+_worker_exporter: Exporter | None = None
+
+
+def _init_worker(topology: Topology, routes: dict | None = None) -> None:
+    global _worker_exporter
+    # The routes and vacancy sections already exist, they were generated in the parent process
+    if routes is not None:
+        # The generated routes are not part of the topology, export them from a copy sharing its elements
+        topology_with_routes = Topology()
+        topology_with_routes.nodes = topology.nodes
+        topology_with_routes.edges = topology.edges
+        topology_with_routes.signals = topology.signals
+        topology_with_routes.routes = routes
+        topology = topology_with_routes
+    _worker_exporter = Exporter(topology, generate_routes=False, generate_vacancy_sections=False)
+
+
+def _export_routes_chunk(route_uuids: list[str]) -> list[dict]:
+    return list(_worker_exporter.iter_routes(route_uuids))
+
+
+def _export_placement_chunk(components: list[int]) -> dict[str, list[tuple[str, dict]]]:
+    return {section: list(entries) for section, entries in _worker_exporter.iter_placement(components)}
+
+
+def _split(items: list, chunks: int) -> list[list]:
+    """Split the items into at most the given number of consecutive chunks of similar size"""
+    size, rest = divmod(len(items), chunks)
+    result = []
+    start = 0
+    for index in range(chunks):
+        end = start + size + (1 if index < rest else 0)
+        if end > start:
+            result.append(items[start:end])
+        start = end
+    return result
+
+
+def export_routes_in_pool(
+    topology: Topology, routes: dict, workers: int, chunks_per_worker: int = 4
+) -> list[dict]:
+    """Export the given routes of the topology by uuid like `Exporter.export_routes()`, using a pool of worker processes"""
+    if not routes:
+        return []
+    chunks = _split(list(routes), workers * chunks_per_worker)
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(topology, routes)
+    ) as executor:
+        return [route for routes in executor.map(_export_routes_chunk, chunks) for route in routes]
+
+
+def _balance(sizes: list[int], chunks: int) -> list[list[int]]:
+    """Distribute the indices of the sizes over at most the given number of chunks, so that the chunks
+    have similar total sizes. The largest items are placed first, each into the currently smallest chunk."""
+    heap = [(0, index, []) for index in range(min(chunks, len(sizes)))]
+    for item in sorted(range(len(sizes)), key=lambda item: -sizes[item]):
+        total, index, items = heapq.heappop(heap)
+        items.append(item)
+        heapq.heappush(heap, (total + sizes[item], index, items))
+    return [items for _, _, items in sorted(heap, key=lambda chunk: chunk[1]) if items]
+
+
+def export_placement_in_pool(
+    topology: Topology, components: list[list], workers: int, chunks_per_worker: int = 4
+) -> dict[str, dict]:
+    """Export the placement like `Exporter.export_placement()`, using a pool of worker processes.
+    components are the connected components of the topology, each given by its nodes. They are placed
+    independently of each other and the results are merged in the order of the topology's nodes and edges."""
+    chunks = _balance([len(nodes) for nodes in components], workers * chunks_per_worker)
+    placed = {"points": {}, "edges": {}}
+    if chunks:
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(topology,)
+        ) as executor:
+            for sections in executor.map(_export_placement_chunk, chunks):
+                for section, entries in sections.items():
+                    placed[section].update(entries)
+    return {
+        "points": {uuid: placed["points"][uuid] for uuid in topology.nodes if uuid in placed["points"]},
+        "edges": {uuid: placed["edges"][uuid] for uuid in topology.edges if uuid in placed["edges"]},
+    }
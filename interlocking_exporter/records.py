@@ -0,0 +1,47 @@
+"""Compact records of the elements the Exporter derives from the topology and keeps between exports.
+
+They only hold what differs between the elements and are turned into the dicts of the export by `as_dict()`,
+each call creating a new dict.
+"""
+
+
+class AxleCountingHead:
+    """An axleCountingHead limiting the trackVacancySection of its edge on one side"""
+
+    __slots__ = ("id", "edge", "vacancy_section", "name", "position")
+
+    def __init__(self, id: str, edge: str, vacancy_section: str, name: str, position: float) -> None:
+        self.id = id
+        self.edge = edge
+        self.vacancy_section = vacancy_section
+        self.name = name
+        self.position = position
+
+    def as_dict(self) -> dict:
+        return {
+            "edge": self.edge,
+            "id": self.id,
+            "limits": [self.vacancy_section],
+            "name": self.name,
+            "position": self.position,
+        }
+
+
+class TrackVacancySection:
+    """A trackVacancySection, limited by the axleCountingHeads of one of its edges"""
+
+    __slots__ = ("id", "limits", "tps_name")
+
+    def __init__(self, id: str, limits: tuple[str, ...], tps_name: str) -> None:
+        self.id = id
+        self.limits = limits
+        self.tps_name = tps_name
+
+    def as_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "limits": list(self.limits),
+            "name": "DE_AC01",
+            "rastaId": None,
+            "tpsName": self.tps_name,
+        }
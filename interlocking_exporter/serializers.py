@@ -0,0 +1,240 @@
+"""Serialize the exports as JSON, MessagePack or CBOR.
+
+MessagePack needs the `msgpack` package and CBOR the `cbor2` package, both are only imported when installed.
+The `formats` extra installs both. Further formats can be added with `register_serializer()`.
+
+With intern_uuids, each uuid is written once into a string table and referenced by its index afterwards.
+The output then consists of two items, the table (a list of strings) followed by the export, in which each
+uuid is replaced by a reference: a MessagePack extension of type UUID_REFERENCE_EXT_TYPE or a CBOR tag
+UUID_REFERENCE_TAG, each holding the index. Strings made of several uuids joined by dots, like the ids of the
+topology's nodes, are replaced by a reference to all of their uuids: an extension of type
+JOINED_UUIDS_REFERENCE_EXT_TYPE holding the indices or a CBOR tag JOINED_UUIDS_REFERENCE_TAG holding a list of
+them. JSON has no way to mark references, so it does not support it.
+"""
+import io
+import json
+import re
+import struct
+from typing import Any, Callable
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+try:
+    import cbor2
+except ImportError:
+    cbor2 = None
+
+# The MessagePack extension types and the CBOR tags (from the first come first served range) of uuid references
+UUID_REFERENCE_EXT_TYPE = 1
+UUID_REFERENCE_TAG = 39321
+JOINED_UUIDS_REFERENCE_EXT_TYPE = 2
+JOINED_UUIDS_REFERENCE_TAG = 39322
+
+_UUID = r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}"
+_UUID_PATTERN = re.compile(_UUID)
+_JOINED_UUIDS_PATTERN = re.compile(rf"{_UUID}(?:\.{_UUID})+")
+
+
+class Serializer:
+    """A format the exports can be written in. dumps and loads convert between an export and bytes,
+    with intern_uuids they take and return the string table and the export with references."""
+
+    def __init__(
+        self,
+        name: str,
+        content_type: str,
+        dumps: Callable[[Any], bytes],
+        loads: Callable[[bytes], Any],
+        dumps_interned: Callable[[list[str], Any], bytes] | None = None,
+        loads_interned: Callable[[bytes], Any] | None = None,
+    ) -> None:
+        self.name = name
+        self.content_type = content_type
+        self.dumps = dumps
+        self.loads = loads
+        self.dumps_interned = dumps_interned
+        self.loads_interned = loads_interned
+
+    @property
+    def supports_interning(self) -> bool:
+        return self.dumps_interned is not None
+
+
+_serializers: dict[str, Serializer] = {}
+
+
+def register_serializer(serializer: Serializer) -> None:
+    _serializers[serializer.name] = serializer
+
+
+def available_formats() -> list[str]:
+    return list(_serializers)
+
+
+def get_serializer(format: str) -> Serializer:
+    serializer = _serializers.get(format)
+    if serializer is None:
+        raise ValueError(f"Unknown or unavailable export format {format!r}, available are {available_formats()}")
+    return serializer
+
+
+def dumps(export, format: str = "json", intern_uuids: bool = False) -> bytes:
+    """Serialize the result of one of the export methods"""
+    serializer = get_serializer(format)
+    if not intern_uuids:
+        return serializer.dumps(export)
+    if not serializer.supports_interning:
+        raise ValueError(f"The {format} format does not support uuid interning")
+    # uuid -> index in the string table
+    strings = {}
+
+    def index_of(value: str) -> int:
+        index = strings.get(value)
+        if index is None:
+            index = strings[value] = len(strings)
+        return index
+
+    def intern(value):
+        if isinstance(value, str):
+            if _UUID_PATTERN.fullmatch(value):
+                return _Reference(index_of(value))
+            if _JOINED_UUIDS_PATTERN.fullmatch(value):
+                return _JoinedReference(tuple(index_of(part) for part in value.split(".")))
+            return value
+        if isinstance(value, dict):
+            return {intern(key): intern(item) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [intern(item) for item in value]
+        return value
+
+    interned = intern(export)
+    return serializer.dumps_interned(list(strings), interned)
+
+
+def loads(data: bytes, format: str = "json", intern_uuids: bool = False):
+    """Read an export written by dumps() with the same format and intern_uuids"""
+    serializer = get_serializer(format)
+    if not intern_uuids:
+        return serializer.loads(data)
+    if not serializer.supports_interning:
+        raise ValueError(f"The {format} format does not support uuid interning")
+    return serializer.loads_interned(data)
+
+
+class _Reference:
+    """A reference to the string table, converted into the format's reference type when writing"""
+
+    __slots__ = ("index",)
+
+    def __init__(self, index: int) -> None:
+        self.index = index
+
+    def __hash__(self) -> int:
+        return hash(self.index)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, _Reference) and other.index == self.index
+
+
+class _JoinedReference:
+    """A reference to several entries of the string table, which are joined by dots when reading"""
+
+    __slots__ = ("indices",)
+
+    def __init__(self, indices: tuple[int, ...]) -> None:
+        self.indices = indices
+
+    def __hash__(self) -> int:
+        return hash(self.indices)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, _JoinedReference) and other.indices == self.indices
+
+
+register_serializer(
+    Serializer(
+        "json",
+        "application/json",
+        dumps=lambda export: json.dumps(export).encode("utf-8"),
+        loads=lambda data: json.loads(data),
+    )
+)
+
+if msgpack is not None:
+
+    def _msgpack_default(value):
+        if isinstance(value, _Reference):
+            return msgpack.ExtType(UUID_REFERENCE_EXT_TYPE, struct.pack(">I", value.index))
+        if isinstance(value, _JoinedReference):
+            return msgpack.ExtType(
+                JOINED_UUIDS_REFERENCE_EXT_TYPE, struct.pack(f">{len(value.indices)}I", *value.indices)
+            )
+        raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+    def _msgpack_loads_interned(data: bytes):
+        strings = []
+
+        def ext_hook(code: int, payload: bytes):
+            if code == UUID_REFERENCE_EXT_TYPE:
+                return strings[struct.unpack(">I", payload)[0]]
+            if code == JOINED_UUIDS_REFERENCE_EXT_TYPE:
+                indices = struct.unpack(f">{len(payload) // 4}I", payload)
+                return ".".join(strings[index] for index in indices)
+            return msgpack.ExtType(code, payload)
+
+        unpacker = msgpack.Unpacker(io.BytesIO(data), ext_hook=ext_hook, strict_map_key=False)
+        strings.extend(unpacker.unpack())
+        return unpacker.unpack()
+
+    register_serializer(
+        Serializer(
+            "msgpack",
+            "application/msgpack",
+            dumps=lambda export: msgpack.packb(export),
+            loads=lambda data: msgpack.unpackb(data, strict_map_key=False),
+            dumps_interned=lambda strings, export: msgpack.packb(strings)
+            + msgpack.packb(export, default=_msgpack_default),
+            loads_interned=_msgpack_loads_interned,
+        )
+    )
+
+if cbor2 is not None:
+
+    def _cbor_default(encoder, value):
+        if isinstance(value, _Reference):
+            encoder.encode(cbor2.CBORTag(UUID_REFERENCE_TAG, value.index))
+            return
+        if isinstance(value, _JoinedReference):
+            encoder.encode(cbor2.CBORTag(JOINED_UUIDS_REFERENCE_TAG, list(value.indices)))
+            return
+        raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+    def _cbor_loads_interned(data: bytes):
+        strings = []
+
+        def tag_hook(*arguments):
+            # cbor2 5 passes (decoder, tag), cbor2 6 passes (tag, immutable)
+            tag = next(argument for argument in arguments if isinstance(argument, cbor2.CBORTag))
+            if tag.tag == UUID_REFERENCE_TAG:
+                return strings[tag.value]
+            if tag.tag == JOINED_UUIDS_REFERENCE_TAG:
+                return ".".join(strings[index] for index in tag.value)
+            return tag
+
+        decoder = cbor2.CBORDecoder(io.BytesIO(data), tag_hook=tag_hook)
+        strings.extend(decoder.decode())
+        return decoder.decode()
+
+    register_serializer(
+        Serializer(
+            "cbor",
+            "application/cbor",
+            dumps=lambda export: cbor2.dumps(export),
+            loads=lambda data: cbor2.loads(data),
+            dumps_interned=lambda strings, export: cbor2.dumps(strings)
+            + cbor2.dumps(export, default=_cbor_default),
+            loads_interned=_cbor_loads_interned,
+        )
+    )
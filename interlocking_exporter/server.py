@@ -0,0 +1,210 @@
+"""Serve the exports of a station to many UI clients at once.
+
+`GET /topology`, `/placement` and `/routes` answer with the exports as JSON. Each export is serialized and
+compressed once per snapshot, so a request only picks the matching bytes. Responses carry an ETag, requests
+with a matching If-None-Match get a 304. Brotli is offered if the `brotli` package is installed, gzip always.
+The `server` extra installs both `websockets` and `brotli`.
+Besides JSON, the server can offer further formats from `serializers`, which clients select with the Accept header.
+
+Clients connected to the WebSocket at `/updates` first receive `{"version": n}` and then, whenever a new
+snapshot is published, `{"version": n, "previous_version": m, "patch": {...}}` with the patch from the previous
+snapshot, see `delta.diff_exports()`. Clients that missed a version fetch the exports again over HTTP.
+
+    server = ExportServer(topology)
+    asyncio.run(server.serve("localhost", 8888))
+"""
+import asyncio
+import gzip
+import hashlib
+import http
+import json
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+try:
+    import websockets
+except ImportError as error:
+    raise ImportError(
+        "The server needs the websockets package, install it with the server extra: interlocking-exporter[server]"
+    ) from error
+from yaramo.model import Topology
+
+from . import serializers
+from .serializers import Serializer, get_serializer
+from .snapshot import EXPORT_KINDS, ExportSnapshot, SnapshotHolder
+
+UPDATES_PATH = "/updates"
+
+
+class Payload:
+    """An export serialized in one format, together with its compressed encodings"""
+
+    __slots__ = ("content_type", "digest", "bodies")
+
+    def __init__(self, export, serializer: Serializer, intern_uuids: bool = False) -> None:
+        self.content_type = serializer.content_type
+        if intern_uuids and serializer.supports_interning:
+            self.content_type += "; uuids=interned"
+        body = serializers.dumps(export, serializer.name, intern_uuids and serializer.supports_interning)
+        self.digest = hashlib.sha256(body).hexdigest()[:32]
+        # encoding -> body, None is the uncompressed body
+        self.bodies: dict[str | None, bytes] = {None: body, "gzip": gzip.compress(body, compresslevel=6)}
+        if brotli is not None:
+            self.bodies["br"] = brotli.compress(body)
+
+    def etag(self, encoding: str | None) -> str:
+        """Each encoding is a different representation and gets its own entity tag"""
+        return f'"{self.digest}-{encoding}"' if encoding else f'"{self.digest}"'
+
+    def choose_encoding(self, accept_encoding: str) -> str | None:
+        """The preferred encoding accepted by the client, or None for the uncompressed body"""
+        accepted = set()
+        for coding in accept_encoding.split(","):
+            name, *parameters = [part.strip() for part in coding.split(";")]
+            quality = 1.0
+            for parameter in parameters:
+                key, _, value = parameter.partition("=")
+                if key.strip() == "q":
+                    try:
+                        quality = float(value)
+                    except ValueError:
+                        quality = 0.0
+            if quality > 0:
+                accepted.add(name.lower())
+        for encoding in ("br", "gzip"):
+            if encoding in self.bodies and (encoding in accepted or "*" in accepted):
+                return encoding
+        return None
+
+
+class ExportServer:
+    """Serves the current snapshot of a SnapshotHolder over HTTP and pushes new snapshots over a WebSocket.
+
+    Snapshots are prepared (exported, serialized and compressed) in a worker thread, so the event loop keeps
+    answering requests with the previous snapshot in the meantime. formats are the names of the serializers to
+    offer besides JSON, intern_uuids applies to those of them that support it."""
+
+    def __init__(
+        self,
+        topology_or_holder: Topology | SnapshotHolder,
+        formats: tuple[str, ...] = (),
+        intern_uuids: bool = False,
+        **exporter_options,
+    ) -> None:
+        if isinstance(topology_or_holder, SnapshotHolder):
+            self.__holder = topology_or_holder
+            self.__topology = None
+        else:
+            self.__holder = SnapshotHolder()
+            self.__topology = topology_or_holder
+        self.__exporter_options = exporter_options
+        self.__serializers = [get_serializer(format) for format in dict.fromkeys(("json", *formats))]
+        self.__intern_uuids = intern_uuids
+        # The published snapshot and the payloads of its exports by path and format, replaced as a whole
+        self.__published: tuple[ExportSnapshot, dict[tuple[str, str], Payload]] | None = None
+        self.__clients = set()
+        self.__publish_lock: asyncio.Lock | None = None
+
+    @property
+    def snapshot(self) -> ExportSnapshot | None:
+        """The snapshot that is currently served"""
+        return self.__published[0] if self.__published else None
+
+    async def reload(self, topology: Topology) -> ExportSnapshot:
+        """Export the topology into a new snapshot and publish it"""
+        snapshot = await asyncio.get_running_loop().run_in_executor(
+            None, self.__snapshot_of, topology
+        )
+        await self.publish(snapshot)
+        return snapshot
+
+    def __snapshot_of(self, topology: Topology) -> ExportSnapshot:
+        current = self.__holder.current
+        version = current.version + 1 if current is not None else 0
+        return ExportSnapshot.from_topology(topology, version, **self.__exporter_options)
+
+    async def publish(self, snapshot: ExportSnapshot) -> None:
+        """Serve the snapshot from now on and push its changes to the connected clients"""
+        if self.__publish_lock is None:
+            self.__publish_lock = asyncio.Lock()
+        async with self.__publish_lock:
+            previous = self.snapshot
+            payloads, message = await asyncio.get_running_loop().run_in_executor(
+                None, self.__prepare, previous, snapshot
+            )
+            self.__holder.swap(snapshot)
+            self.__published = (snapshot, payloads)
+            if message is not None:
+                websockets.broadcast(self.__clients, message)
+
+    def __prepare(self, previous: ExportSnapshot | None, snapshot: ExportSnapshot) -> tuple[dict, str | None]:
+        payloads = {
+            (f"/{kind}", serializer.name): Payload(getattr(snapshot, kind), serializer, self.__intern_uuids)
+            for kind in EXPORT_KINDS
+            for serializer in self.__serializers
+        }
+        message = None
+        if previous is not None:
+            message = json.dumps(
+                {"version": snapshot.version, "previous_version": previous.version, "patch": previous.diff(snapshot)}
+            )
+        return payloads, message
+
+    async def serve(self, host: str = "localhost", port: int = 8888) -> None:
+        """Serve the exports until cancelled"""
+        if self.__published is None:
+            if self.__topology is not None:
+                await self.reload(self.__topology)
+                self.__topology = None
+            else:
+                await self.publish(self.__holder.current)
+        async with websockets.serve(self.__handle_updates, host, port, process_request=self.__process_request):
+            await asyncio.Future()
+
+    async def __process_request(self, path: str, request_headers):
+        """Answer plain HTTP requests for the exports, WebSocket handshakes on UPDATES_PATH continue"""
+        path = path.split("?", 1)[0]
+        if path == UPDATES_PATH:
+            return None
+        headers = [("Access-Control-Allow-Origin", "*")]
+        payload = self.__published[1].get((path, self.__choose_format(request_headers.get("Accept", ""))))
+        if payload is None:
+            return http.HTTPStatus.NOT_FOUND, headers, b"Not found\n"
+
+        encoding = payload.choose_encoding(request_headers.get("Accept-Encoding", ""))
+        etag = payload.etag(encoding)
+        headers += [("ETag", etag), ("Cache-Control", "no-cache"), ("Vary", "Accept, Accept-Encoding")]
+        if_none_match = request_headers.get("If-None-Match", "")
+        if if_none_match.strip() == "*" or etag in [tag.strip() for tag in if_none_match.split(",")]:
+            return http.HTTPStatus.NOT_MODIFIED, headers, b""
+
+        headers.append(("Content-Type", payload.content_type))
+        if encoding:
+            headers.append(("Content-Encoding", encoding))
+        return http.HTTPStatus.OK, headers, payload.bodies[encoding]
+
+    def __choose_format(self, accept: str) -> str:
+        """The first offered format whose content type the client explicitly accepts, otherwise JSON"""
+        accepted = {media_range.split(";")[0].strip().lower() for media_range in accept.split(",")}
+        for serializer in self.__serializers:
+            if serializer.content_type in accepted:
+                return serializer.name
+        return "json"
+
+    async def __handle_updates(self, websocket, path: str | None = None) -> None:
+        self.__clients.add(websocket)
+        try:
+            await websocket.send(json.dumps({"version": self.snapshot.version}))
+            await websocket.wait_closed()
+        finally:
+            self.__clients.discard(websocket)
+
+
+def run(topology: Topology, host: str = "localhost", port: int = 8888, **server_options) -> None:
+    """Serve the exports of the topology until interrupted, see ExportServer for the options"""
+    try:
+        asyncio.run(ExportServer(topology, **server_options).serve(host, port))
+    except KeyboardInterrupt:
+        pass
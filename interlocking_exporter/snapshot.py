@@ -0,0 +1,105 @@
+"""Immutable snapshots of all exports of a topology, for serving them to many readers at once.
+
+A server loads a station into a `SnapshotHolder` and hands `holder.current` to each request. Reloading the
+station builds the next snapshot aside and swaps it in, requests still reading the previous snapshot are not
+affected and new requests never wait for a reload.
+
+Snapshots are only immutable by convention: they hold the very dicts and lists the Exporter returned, which the
+Exporter and its cache keep as well. Nothing prevents modifying them, readers that need to change an export have
+to copy it first.
+"""
+import threading
+
+from yaramo.model import Topology
+
+from .delta import diff_exports
+from .exporter import Exporter
+
+EXPORT_KINDS = ("topology", "placement", "routes")
+
+
+class ExportSnapshot:
+    """The topology, placement and routes exports of a topology, computed completely when the snapshot is created.
+
+    As long as nobody modifies the exports, any number of threads can read a snapshot without locking.
+    The exports are not copied, they are the dicts and lists returned by the Exporter and also held by it and its
+    cache, so modifying them would change what these return as well."""
+
+    __slots__ = ("__exports", "__version")
+
+    def __init__(self, exports: dict, version: int = 0) -> None:
+        self.__exports = {kind: exports[kind] for kind in EXPORT_KINDS}
+        self.__version = version
+
+    @classmethod
+    def from_exporter(cls, exporter: Exporter, version: int = 0) -> "ExportSnapshot":
+        return cls(
+            {
+                "topology": exporter.export_topology(),
+                "placement": exporter.export_placement(),
+                "routes": exporter.export_routes(),
+            },
+            version,
+        )
+
+    @classmethod
+    def from_topology(cls, topology: Topology, version: int = 0, **exporter_options) -> "ExportSnapshot":
+        """Export the topology with an Exporter created with the given options"""
+        return cls.from_exporter(Exporter(topology, **exporter_options), version)
+
+    @property
+    def version(self) -> int:
+        return self.__version
+
+    @property
+    def topology(self) -> dict:
+        return self.__exports["topology"]
+
+    @property
+    def placement(self) -> dict:
+        return self.__exports["placement"]
+
+    @property
+    def routes(self) -> list:
+        return self.__exports["routes"]
+
+    @property
+    def exports(self) -> dict:
+        """The exports by kind, as used by `delta.diff_exports()`"""
+        return dict(self.__exports)
+
+    def diff(self, newer: "ExportSnapshot") -> dict:
+        """The patch from this snapshot to a newer one"""
+        return diff_exports(self.__exports, newer.exports)
+
+
+class SnapshotHolder:
+    """Holds the current snapshot of a loaded station.
+
+    Readers take `current` without locking and keep using the snapshot they got. Reloads build the next
+    snapshot while the previous one is still served and then replace it with a single assignment."""
+
+    def __init__(self, snapshot: ExportSnapshot | None = None) -> None:
+        self.__snapshot = snapshot
+        # Serializes swaps and reloads, readers never take it
+        self.__swap_lock = threading.Lock()
+
+    @property
+    def current(self) -> ExportSnapshot | None:
+        return self.__snapshot
+
+    def swap(self, snapshot: ExportSnapshot) -> ExportSnapshot | None:
+        """Make the snapshot the current one and return the previous one"""
+        with self.__swap_lock:
+            previous, self.__snapshot = self.__snapshot, snapshot
+        return previous
+
+    def reload(self, topology: Topology, **exporter_options) -> ExportSnapshot:
+        """Export the topology into a new snapshot and make it the current one.
+        Its version is one higher than the one of the previous snapshot."""
+        with self.__swap_lock:
+            previous = self.__snapshot
+            version = previous.version + 1 if previous is not None else 0
+            snapshot = ExportSnapshot.from_topology(topology, version, **exporter_options)
+            self.__snapshot = snapshot
+        return snapshot
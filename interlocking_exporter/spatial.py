@@ -0,0 +1,75 @@
+import math
+from collections import defaultdict
+from typing import Iterable
+
+
+class GridIndex:
+    """Uniform grid over points, for finding the points in a bounding box.
+
+    The cells are squares sized from the density of the points, so that there is about one point per cell on average
+    whether the points spread over an area or along a line, as the nodes of a railway line do. Only cells containing
+    points are stored. A query visits the cells overlapping the box, so its cost grows with the size of the box
+    and the number of points in it rather than with the number of indexed points.
+    """
+
+    def __init__(self, points: Iterable[tuple[int, float, float]]) -> None:
+        """points are (id, x, y) triples"""
+        points = list(points)
+        # cell -> the (id, x, y) of the points in it
+        self.__cells: dict[tuple[int, int], list[tuple[int, float, float]]] = defaultdict(list)
+        if not points:
+            self.__origin = (0.0, 0.0)
+            self.__cell_size = 1.0
+            return
+        min_x = min(x for _, x, _ in points)
+        min_y = min(y for _, _, y in points)
+        width = max(x for _, x, _ in points) - min_x
+        height = max(y for _, _, y in points) - min_y
+        self.__origin = (min_x, min_y)
+        # The area of the box divided into one cell per point, or for points along a line its length,
+        # whichever gives larger cells. Either way there are O(len(points)) cells in the box.
+        cell_size = max(math.sqrt(width * height / len(points)), max(width, height) / len(points))
+        self.__cell_size = cell_size if cell_size > 0 else 1.0
+        for point in points:
+            self.__cells[self.__cell_of(point[1], point[2])].append(point)
+        self.__cells = dict(self.__cells)
+
+    @property
+    def cell_size(self) -> float:
+        return self.__cell_size
+
+    def __cell_of(self, x: float, y: float) -> tuple[int, int]:
+        return (
+            math.floor((x - self.__origin[0]) / self.__cell_size),
+            math.floor((y - self.__origin[1]) / self.__cell_size),
+        )
+
+    def query(self, min_x: float, min_y: float, max_x: float, max_y: float) -> list[int]:
+        """The ids of the points inside the box, borders included, in ascending order"""
+        if min_x > max_x or min_y > max_y:
+            return []
+        first_x, first_y = self.__cell_of(min_x, min_y)
+        last_x, last_y = self.__cell_of(max_x, max_y)
+        if (last_x - first_x + 1) * (last_y - first_y + 1) > len(self.__cells):
+            # The box covers more cells than there are points, look at the stored cells instead
+            cells = [
+                points
+                for (cell_x, cell_y), points in self.__cells.items()
+                if first_x <= cell_x <= last_x and first_y <= cell_y <= last_y
+            ]
+        else:
+            cells = [
+                self.__cells[cell]
+                for cell in (
+                    (cell_x, cell_y)
+                    for cell_x in range(first_x, last_x + 1)
+                    for cell_y in range(first_y, last_y + 1)
+                )
+                if cell in self.__cells
+            ]
+        return sorted(
+            point_id
+            for points in cells
+            for point_id, x, y in points
+            if min_x <= x <= max_x and min_y <= y <= max_y
+        )
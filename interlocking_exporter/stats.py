@@ -0,0 +1,81 @@
+"""Opt-in instrumentation of the Exporter.
+
+    stats = ExportStats(trace_memory=True)
+    exporter = Exporter(topology, stats=stats)
+    exporter.export_routes()
+    print(stats.as_dict())
+
+Phases are the preparation steps (e.g. "vacancy_sections" running the VacancySectionGenerator, "routes" running the
+RouteGenerator), the orientation passes and the export methods. Phases can be nested, the time of a phase includes
+the phases it runs. Without stats the Exporter skips all of this.
+"""
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+
+class ExportStats:
+    """Wall time and call count per phase, event counters and, with trace_memory, the peak traced memory per phase.
+
+    Memory is traced with tracemalloc while a phase runs, unless tracing was already started by someone else.
+    Tracing slows the export down considerably, so the timings of such a run are not representative."""
+
+    def __init__(self, trace_memory: bool = False) -> None:
+        self.trace_memory = trace_memory
+        self.timings: dict[str, float] = defaultdict(float)
+        self.calls: dict[str, int] = defaultdict(int)
+        self.counters: dict[str, int] = defaultdict(int)
+        # phase -> highest traced memory in bytes while it ran
+        self.peak_memory: dict[str, int] = {}
+        # The highest traced memory seen so far in each running phase, innermost last
+        self.__running_peaks: list[int] = []
+        self.__started_tracing = False
+
+    def count(self, counter: str, amount: int = 1) -> None:
+        self.counters[counter] += amount
+
+    @contextmanager
+    def phase(self, name: str):
+        """Record the wall time (and memory) of the code in the with block as the phase"""
+        if self.trace_memory:
+            self.__enter_memory_phase()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] += time.perf_counter() - start
+            self.calls[name] += 1
+            if self.trace_memory:
+                self.__exit_memory_phase(name)
+
+    def __enter_memory_phase(self) -> None:
+        # Imported here, it is slow to import and only needed with trace_memory
+        import tracemalloc
+
+        if not self.__running_peaks and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.__started_tracing = True
+        elif self.__running_peaks:
+            # The peak is reset for the new phase, keep the one the outer phase reached until now
+            self.__running_peaks[-1] = max(self.__running_peaks[-1], tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()
+        self.__running_peaks.append(0)
+
+    def __exit_memory_phase(self, name: str) -> None:
+        import tracemalloc
+
+        peak = max(self.__running_peaks.pop(), tracemalloc.get_traced_memory()[1])
+        self.peak_memory[name] = max(peak, self.peak_memory.get(name, 0))
+        if self.__running_peaks:
+            self.__running_peaks[-1] = max(self.__running_peaks[-1], peak)
+        elif self.__started_tracing:
+            tracemalloc.stop()
+            self.__started_tracing = False
+
+    def as_dict(self) -> dict:
+        return {
+            "timings": dict(self.timings),
+            "calls": dict(self.calls),
+            "counters": dict(self.counters),
+            "peak_memory": dict(self.peak_memory),
+        }
@@ -0,0 +1,49 @@
+"""Write the exports as JSON without building the whole document in memory.
+
+The writers take a text file object, e.g. an open file or `socket.makefile("w", encoding="utf-8")`,
+and write one entry at a time. The output is the same JSON as `json.dump()` of the corresponding
+`export_*()` result.
+"""
+import json
+from typing import Iterable, TextIO
+
+from .exporter import Exporter
+
+_encoder = json.JSONEncoder()
+
+
+def write_sections(sections: Iterable[tuple[str, Iterable[tuple[str, dict]]]], fp: TextIO) -> None:
+    """Write sections of (id, entry) pairs, as yielded by `Exporter.iter_topology()`, as a JSON object of objects"""
+    fp.write("{")
+    for section_index, (section, entries) in enumerate(sections):
+        if section_index:
+            fp.write(", ")
+        fp.write(f"{_encoder.encode(section)}: {{")
+        for entry_index, (key, entry) in enumerate(entries):
+            if entry_index:
+                fp.write(", ")
+            fp.write(f"{_encoder.encode(key)}: {_encoder.encode(entry)}")
+        fp.write("}")
+    fp.write("}")
+
+
+def write_items(items: Iterable[dict], fp: TextIO) -> None:
+    """Write items, as yielded by `Exporter.iter_routes()`, as a JSON array"""
+    fp.write("[")
+    for index, item in enumerate(items):
+        if index:
+            fp.write(", ")
+        fp.write(_encoder.encode(item))
+    fp.write("]")
+
+
+def write_topology(exporter: Exporter, fp: TextIO, include_routes=True) -> None:
+    write_sections(exporter.iter_topology(include_routes), fp)
+
+
+def write_placement(exporter: Exporter, fp: TextIO) -> None:
+    write_sections(exporter.iter_placement(), fp)
+
+
+def write_routes(exporter: Exporter, fp: TextIO) -> None:
+    write_items(exporter.iter_routes(), fp)
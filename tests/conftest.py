@@ -0,0 +1,20 @@
+import pytest
+
+from benchmarks.topology_generator import generate_topology
+
+# Double edge loops connect pairs of points by two edges, whose assignment to the branches has to stay the same
+SMALL_TOPOLOGY = dict(line_length=20, points=3, crossovers=1, double_edge_loops=3, signals_per_edge=1, seed=2)
+
+
+@pytest.fixture
+def small_topology():
+    return generate_topology(**SMALL_TOPOLOGY)
+
+
+@pytest.fixture
+def two_components(small_topology):
+    """small_topology with the nodes, edges and signals of another topology added, and that other topology"""
+    other = generate_topology(**{**SMALL_TOPOLOGY, "seed": SMALL_TOPOLOGY["seed"] + 1})
+    for section in ["nodes", "edges", "signals"]:
+        getattr(small_topology, section).update(getattr(other, section))
+    return small_topology, other
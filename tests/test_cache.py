@@ -0,0 +1,78 @@
+import os
+import pickle
+import uuid
+from types import SimpleNamespace
+
+from interlocking_exporter.cache import ExportCache
+from interlocking_exporter.exporter import Exporter
+
+def test_a_placement_miss_does_not_generate_the_routes(tmp_path, small_topology):
+    exporter = Exporter(small_topology, cache=ExportCache(str(tmp_path)))
+    exporter.export_placement()
+    exporter.export_topology(include_routes=False)
+
+    assert "routes" not in exporter.completed_steps
+    # A topology without routes is not stored
+    assert len(os.listdir(tmp_path)) == 1
+
+
+def test_exports_are_served_from_the_cache_without_running_any_step(tmp_path, small_topology):
+    cache = ExportCache(str(tmp_path))
+    topology = small_topology
+    # The same topology as loaded again in another process, before the generators changed it
+    unchanged_topology = pickle.loads(pickle.dumps(topology))
+    exporter = Exporter(topology, cache=cache)
+    topology_export = exporter.export_topology()
+    placement = exporter.export_placement()
+    routes = exporter.export_routes()
+
+    cached = Exporter(unchanged_topology, cache=cache)
+    assert cached.export_topology() == topology_export
+    assert cached.export_topology(include_routes=False) == {**topology_export, "routes": {}}
+    assert cached.export_placement() == placement
+    assert cached.export_routes() == routes
+    assert cached.completed_steps == frozenset()
+
+
+class RandomUuidVacancySectionGenerator:
+    """Names the vacancy sections differently with each run"""
+
+    def __init__(self, topology) -> None:
+        self.topology = topology
+
+    def generate(self) -> None:
+        for edge in self.topology.edges.values():
+            edge.vacancy_section = SimpleNamespace(uuid=str(uuid.uuid4()))
+
+
+def test_cached_topologies_and_routes_refer_to_the_same_vacancy_sections(tmp_path, monkeypatch, small_topology):
+    import vacancy_section_generator.generator
+
+    monkeypatch.setattr(vacancy_section_generator.generator, "VacancySectionGenerator", RandomUuidVacancySectionGenerator)
+    cache = ExportCache(str(tmp_path))
+    topology = small_topology
+    unchanged_topology = pickle.loads(pickle.dumps(topology))
+    Exporter(topology, cache=cache).export_topology()
+
+    cached = Exporter(unchanged_topology, cache=cache)
+    sections = cached.export_topology()["trackVacancySections"]
+    routes = cached.export_routes()
+
+    route_sections = {state["uuid"] for route in routes for state in route["states"] if state["type"] == "vacancy_section"}
+    assert route_sections
+    assert route_sections <= set(sections)
+
+
+def test_the_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ExportCache(str(tmp_path), max_size=2500)
+    for key in "abc":
+        cache.put(key, {"value": "x" * 1000})
+        # Entries used within the resolution of the file system's timestamps would be evicted in any order
+        os.utime(tmp_path / f"{key}.json", (ord(key), ord(key)))
+    assert cache.get("a") is None
+    assert cache.get("b") is not None
+    cache.put("d", {"value": "x" * 1000})
+
+    assert cache.get("b") == {"value": "x" * 1000}
+    assert cache.get("c") is None
+    assert cache.get("d") is not None
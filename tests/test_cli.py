@@ -0,0 +1,38 @@
+import json
+import pickle
+
+from interlocking_exporter.cli import main, read_manifest
+from interlocking_exporter.exporter import Exporter
+
+
+def test_a_failing_station_does_not_stop_the_others(tmp_path, small_topology):
+    topology = small_topology
+    (tmp_path / "station.pickle").write_bytes(pickle.dumps(topology))
+    (tmp_path / "broken.pickle").write_bytes(b"not a topology")
+    (tmp_path / "manifest.json").write_text(
+        json.dumps(["station.pickle", {"input": "broken.pickle", "name": "broken", "generate_routes": False}])
+    )
+    output = tmp_path / "exports"
+
+    exit_code = main([str(tmp_path / "manifest.json"), "--output", str(output), "--workers", "2"])
+
+    assert exit_code == 1
+    summary = json.loads((output / "summary.json").read_text())
+    assert [(result["name"], result["status"]) for result in summary] == [("station", "ok"), ("broken", "failed")]
+    assert summary[1]["error"].startswith("load: ")
+    placement = json.loads((output / "station" / "placement.json").read_text())
+    assert placement == json.loads(json.dumps(Exporter(topology).export_placement()))
+    assert {path.name for path in (output / "station").iterdir()} == {"topology.json", "placement.json", "routes.json"}
+
+
+def test_the_manifest_names_the_stations_and_passes_the_options(tmp_path):
+    (tmp_path / "manifest.json").write_text(
+        json.dumps(["a/one.pickle", {"input": "two.json", "name": "second", "generate_vacancy_sections": False}])
+    )
+
+    stations = read_manifest(str(tmp_path / "manifest.json"))
+
+    assert stations == [
+        {"name": "one", "input": str(tmp_path / "a" / "one.pickle"), "options": {}},
+        {"name": "second", "input": str(tmp_path / "two.json"), "options": {"generate_vacancy_sections": False}},
+    ]
@@ -0,0 +1,58 @@
+from interlocking_exporter.delta import apply_patch, diff_entries, diff_exports
+
+OLD = {
+    "topology": {
+        "edges": {"a": {"id": "a", "laenge": 1}, "b": {"id": "b", "laenge": 2}},
+        "signals": {"s": {"id": "s", "name": "S1"}},
+    },
+    "placement": {"edges": {"a": {"items": [], "orientation": "normal"}}},
+    "routes": [{"uuid": "r1", "maximum_speed": 60}, {"uuid": "r2", "maximum_speed": 80}],
+}
+NEW = {
+    "topology": {
+        "edges": {"a": {"id": "a", "laenge": 1}, "c": {"id": "c", "laenge": 3}},
+        "signals": {"s": {"id": "s", "name": "S2"}},
+    },
+    "placement": {"edges": {"a": {"items": [], "orientation": "normal"}}},
+    "routes": [{"uuid": "r1", "maximum_speed": 40}, {"uuid": "r3", "maximum_speed": 80}],
+}
+
+
+def test_a_patch_holds_only_the_differences():
+    assert diff_exports(OLD, NEW) == {
+        "topology": {
+            "edges": {"added": {"c": {"id": "c", "laenge": 3}}, "removed": ["b"]},
+            "signals": {"changed": {"s": {"id": "s", "name": "S2"}}},
+        },
+        "routes": {
+            "added": {"r3": {"uuid": "r3", "maximum_speed": 80}},
+            "removed": ["r2"],
+            "changed": {"r1": {"uuid": "r1", "maximum_speed": 40}},
+        },
+    }
+
+
+def test_applying_the_patch_gives_the_new_exports():
+    assert apply_patch(OLD, diff_exports(OLD, NEW)) == NEW
+    assert apply_patch(NEW, diff_exports(NEW, OLD)) == OLD
+    assert diff_exports(NEW, NEW) == {}
+
+
+def test_applying_a_patch_does_not_change_the_exports_or_share_entries_with_the_patch():
+    patch = diff_exports(OLD, NEW)
+    patched = apply_patch(OLD, patch)
+    patched["topology"]["signals"]["s"]["name"] = "S3"
+
+    assert OLD["topology"]["edges"]["b"] == {"id": "b", "laenge": 2}
+    assert patch["topology"]["signals"]["changed"]["s"]["name"] == "S2"
+
+
+def test_keys_restrict_the_comparison():
+    old = {"a": 1, "b": 2, "c": 3}
+    new = {"a": 1, "b": 4, "d": 5}
+
+    assert diff_entries(old, new, ["b", "d"]) == {"added": {"d": 5}, "changed": {"b": 4}}
+    assert diff_exports(OLD, NEW, {"topology": {"edges": ["c"]}, "placement": {}, "routes": ["r2"]}) == {
+        "topology": {"edges": {"added": {"c": {"id": "c", "laenge": 3}}}},
+        "routes": {"removed": ["r2"]},
+    }
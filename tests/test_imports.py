@@ -0,0 +1,46 @@
+import json
+import os
+import pickle
+import subprocess
+import sys
+
+from benchmarks.topology_generator import generate_topology
+from interlocking_exporter.exporter import Exporter
+
+GENERATORS = {"railwayroutegenerator", "vacancy_section_generator"}
+
+
+def loaded_generators(setup: str, code: str) -> list[str]:
+    """The generator packages a fresh interpreter imports while running code after setup"""
+    check = "\n".join([
+        "import json",
+        "import sys",
+        setup,
+        "loaded = set(sys.modules)",
+        code,
+        f"print(json.dumps(sorted({{name.split('.')[0] for name in set(sys.modules) - loaded}} & {GENERATORS!r})))",
+    ])
+    result = subprocess.run(
+        [sys.executable, "-c", check],
+        capture_output=True,
+        text=True,
+        check=True,
+        env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+    )
+    return json.loads(result.stdout)
+
+
+def test_importing_the_exporter_does_not_load_the_generators():
+    assert loaded_generators("", "import interlocking_exporter.exporter") == []
+
+
+def test_placing_a_prepared_topology_does_not_load_the_generators(tmp_path):
+    topology = generate_topology(line_length=10, points=2, seed=10)
+    # Runs the vacancy section generator on the topology
+    Exporter(topology, generate_routes=False).export_placement()
+    (tmp_path / "topology.pickle").write_bytes(pickle.dumps(topology))
+
+    # Unpickling imports the modules of the vacancy sections' classes, only the export is checked
+    setup = f"import pickle\ntopology = pickle.loads(open({str(tmp_path / 'topology.pickle')!r}, 'rb').read())"
+    code = "from interlocking_exporter.exporter import Exporter\nExporter(topology).export_placement()"
+    assert loaded_generators(setup, code) == []
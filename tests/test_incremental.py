@@ -0,0 +1,91 @@
+import pickle
+
+from yaramo.model import Edge, Node, Signal, SignalDirection, SignalFunction, SignalKind
+
+from interlocking_exporter.delta import apply_patch, diff_exports
+from interlocking_exporter.exporter import Exporter
+from interlocking_exporter.stats import ExportStats
+
+def all_exports(exporter: Exporter) -> dict:
+    return {
+        "topology": exporter.export_topology(),
+        "placement": exporter.export_placement(),
+        "routes": exporter.export_routes(),
+    }
+
+
+def extend_line(topology) -> dict:
+    """Changes adding a new edge with a signal at an end of the topology, removing a signal and
+    modifying an edge and a signal"""
+    end = next(node for node in topology.nodes.values() if len(node.connected_nodes) == 1)
+    branch = next(branch for branch in ["head", "left", "right"] if getattr(end, f"connected_on_{branch}") is None)
+    node = Node(name="X")
+    getattr(end, f"set_connection_{branch}")(node)
+    node.set_connection_head(end)
+    edge = Edge(end, node, length=77)
+    signal = Signal(edge, 0.5, SignalDirection.IN, SignalFunction.Block_Signal, SignalKind.Hauptsignal, name="SX")
+    edge.signals.append(signal)
+
+    removed = next(signal for signal in topology.signals.values() if signal.edge.node_a is not end and signal.edge.node_b is not end)
+    removed.edge.signals.remove(removed)
+    modified_signal = next(signal for signal in topology.signals.values() if signal is not removed)
+    modified_signal.name = "renamed"
+    modified_edge = list(topology.edges.values())[3]
+    modified_edge.length = 999
+    return dict(added=[node, edge, signal], removed=[removed], modified=[end, modified_signal, modified_edge])
+
+
+def test_the_delta_patches_the_previous_exports_to_the_new_ones(small_topology):
+    exporter = Exporter(small_topology)
+    before = all_exports(exporter)
+
+    delta = exporter.apply_changes(**extend_line(exporter.topology))
+    after = all_exports(exporter)
+
+    assert delta == diff_exports(before, after)
+    assert apply_patch(before, delta) == after
+
+
+def test_the_updated_exports_equal_those_of_the_edited_topology(small_topology):
+    exporter = Exporter(small_topology)
+    all_exports(exporter)
+
+    exporter.apply_changes(**extend_line(exporter.topology))
+    fresh = Exporter(pickle.loads(pickle.dumps(exporter.topology)), generate_routes=False)
+
+    assert {**exporter.export_topology(), "routes": {}} == fresh.export_topology(include_routes=False)
+    assert exporter.export_placement() == fresh.export_placement()
+
+
+def test_changing_lengths_and_names_does_not_generate_the_routes(monkeypatch, small_topology):
+    from railwayroutegenerator.routegenerator import RouteGenerator
+
+    exporter = Exporter(small_topology)
+    before = all_exports(exporter)
+    edge = next(iter(exporter.topology.edges.values()))
+    edge.length = 1234
+    generated = []
+    monkeypatch.setattr(RouteGenerator, "generate_routes", lambda self: generated.append(self))
+
+    delta = exporter.apply_changes(modified=[edge])
+
+    assert generated == []
+    # The indexes of export_subgraph() are not built for an edit
+    assert not {"spatial_index", "route_index"} & exporter.completed_steps
+    assert delta["topology"]["edges"] == {"changed": {edge.uuid: exporter.export_topology()["edges"][edge.uuid]}}
+    assert exporter.export_routes() == before["routes"]
+
+
+def test_only_the_changed_components_are_oriented_again(two_components):
+    topology, other = two_components
+    stats = ExportStats()
+    exporter = Exporter(topology, generate_routes=False, stats=stats)
+    placement = exporter.export_placement()
+    assert stats.calls["node_orientations"] == 2
+
+    edge = next(iter(other.edges.values()))
+    edge.length = 1234
+    exporter.apply_changes(modified=[edge])
+
+    assert stats.calls["node_orientations"] == 3
+    assert exporter.export_placement() == placement
@@ -0,0 +1,64 @@
+import sys
+
+from benchmarks.topology_generator import generate_topology
+from interlocking_exporter.exporter import Exporter
+
+# Orientation and divertsInDirection of the points and orientation of the edges (in the order of topology.edges)
+# of GOLDEN_TOPOLOGY, as computed by the former recursive traversals
+GOLDEN_TOPOLOGY = dict(line_length=30, points=4, crossovers=3, double_edge_loops=3, signals_per_edge=0, seed=5)
+RECURSIVE_POINTS = {
+    "A3": ("Left", "reverse"),
+    "A5": ("Left", "reverse"),
+    "A6": ("Left", "normal"),
+    "A10": ("Right", "reverse"),
+    "A11": ("Left", "reverse"),
+    "A13": ("Right", "reverse"),
+    "A14": ("Left", "reverse"),
+    "A15": ("Left", "normal"),
+    "A18": ("Left", "reverse"),
+    "A25": ("Right", "reverse"),
+    "A26": ("Left", "reverse"),
+    "A27": ("Left", "normal"),
+    "A29": ("Right", "reverse"),
+    "B4": ("Left", "normal"),
+    "B11": ("Right", "normal"),
+    "B12": ("Right", "normal"),
+}
+RECURSIVE_EDGE_ORIENTATIONS = [
+    "reverse", "normal", "normal", "normal", "normal", "normal", "reverse", "normal",
+    "reverse", "normal", "reverse", "normal", "reverse", "normal", "normal", "reverse",
+    "normal", "reverse", "normal", "normal", "reverse", "normal", "reverse", "normal",
+    "normal", "reverse", "normal", "reverse", "normal", "reverse", "normal", "reverse",
+    "normal", "reverse", "normal", "reverse", "normal", "normal", "reverse", "normal",
+    "reverse", "normal", "reverse", "normal", "reverse", "reverse", "reverse", "reverse",
+    "reverse", "reverse", "reverse", "reverse", "normal", "normal", "normal", "normal",
+    "normal", "normal", "normal", "normal", "normal", "normal", "normal", "normal",
+    "normal", "normal", "normal", "normal", "normal", "normal",
+]
+
+
+def test_orientations_match_the_recursive_traversal():
+    topology = generate_topology(**GOLDEN_TOPOLOGY)
+    placement = Exporter(topology, generate_routes=False).export_placement()
+
+    points = {
+        topology.nodes[uuid].name: (point["orientation"], point["divertsInDirection"])
+        for uuid, point in placement["points"].items()
+    }
+    assert points == RECURSIVE_POINTS
+    assert [placement["edges"][uuid]["orientation"] for uuid in topology.edges] == RECURSIVE_EDGE_ORIENTATIONS
+
+
+def test_orientation_of_a_100k_node_line_does_not_hit_the_recursion_limit():
+    topology = generate_topology(line_length=100_000, points=1000, signals_per_edge=0)
+    assert len(topology.nodes) > 100_000 > sys.getrecursionlimit()
+
+    placement = Exporter(topology, generate_routes=False).export_placement()
+
+    assert len(placement["edges"]) == len(topology.edges)
+    assert all(edge["orientation"] in ("normal", "reverse") for edge in placement["edges"].values())
+    assert len(placement["points"]) == 1000
+    assert all(
+        point["orientation"] is not None and point["divertsInDirection"] in ("normal", "reverse")
+        for point in placement["points"].values()
+    )
@@ -0,0 +1,17 @@
+from interlocking_exporter.exporter import Exporter
+
+
+def test_routes_exported_across_processes_equal_the_sequential_ones(small_topology):
+    exporter = Exporter(small_topology)
+    routes = exporter.export_routes()
+
+    assert exporter.export_routes(workers=2) == routes
+
+
+def test_components_placed_across_processes_equal_the_sequential_placement(two_components):
+    topology, _ = two_components
+    exporter = Exporter(topology, generate_routes=False)
+    placement = exporter.export_placement()
+
+    assert len(exporter.components) == 2
+    assert exporter.export_placement(workers=2) == placement
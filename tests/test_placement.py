@@ -0,0 +1,14 @@
+from benchmarks.topology_generator import generate_topology
+from interlocking_exporter.exporter import Exporter
+
+
+def test_placement_lists_the_axle_counting_heads_of_each_edge():
+    topology = generate_topology(line_length=20, points=3, double_edge_loops=2, signals_per_edge=0)
+    exporter = Exporter(topology, generate_routes=False)
+    heads = exporter.export_topology(include_routes=False)["axleCountingHeads"]
+    placement = exporter.export_placement()
+
+    for uuid, edge in placement["edges"].items():
+        edge_heads = [item for item in edge["items"] if item in heads]
+        assert [heads[head]["position"] for head in edge_heads] == [0.1, 0.9]
+        assert all(heads[head]["edge"] == uuid for head in edge_heads)
@@ -0,0 +1,28 @@
+from interlocking_exporter.exporter import Exporter, axle_counting_head_id
+from interlocking_exporter.records import AxleCountingHead, TrackVacancySection
+
+
+def test_records_are_turned_into_the_entries_of_the_export():
+    head = AxleCountingHead("h", "e", "tvs", "S1 / L", 0.1)
+    section = TrackVacancySection("tvs", ("h", "h2"), "e")
+
+    assert head.as_dict() == {"edge": "e", "id": "h", "limits": ["tvs"], "name": "S1 / L", "position": 0.1}
+    assert section.as_dict() == {
+        "id": "tvs", "limits": ["h", "h2"], "name": "DE_AC01", "rastaId": None, "tpsName": "e"
+    }
+    assert not hasattr(head, "__dict__")
+
+
+def test_each_export_creates_new_entries(small_topology):
+    exporter = Exporter(small_topology, generate_routes=False)
+    first = exporter.export_topology(include_routes=False)
+    edge_uuid = next(iter(exporter.topology.edges))
+    head = first["axleCountingHeads"][axle_counting_head_id(edge_uuid, "L")]
+    section = first["trackVacancySections"][head["limits"][0]]
+    head["limits"].append("changed")
+    section["limits"].clear()
+
+    second = exporter.export_topology(include_routes=False)
+
+    assert second["axleCountingHeads"][head["id"]]["limits"] == head["limits"][:1]
+    assert second["trackVacancySections"][section["id"]]["limits"] != []
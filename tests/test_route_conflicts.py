@@ -0,0 +1,34 @@
+from benchmarks.topology_generator import generate_topology
+from interlocking_exporter.exporter import Exporter
+
+
+def route_resources(route: dict) -> tuple[set[str], dict[str, str]]:
+    """The vacancy sections and the point positions a route needs"""
+    sections = {state["uuid"] for state in route["states"] if state["type"] == "vacancy_section"}
+    points = {state["uuid"]: state["state"] for state in route["states"] if state["type"] == "point"}
+    return sections, points
+
+
+def test_routes_conflict_if_they_share_a_section_or_need_a_point_in_different_positions():
+    # Every edge has a signal, so the exported states list all vacancy sections of a route
+    exporter = Exporter(generate_topology(line_length=30, points=4, crossovers=3, double_edge_loops=1, seed=15))
+    routes = exporter.export_routes()
+    result = exporter.export_route_conflicts()
+
+    assert result["routes"] == [route["uuid"] for route in routes]
+    resources = [route_resources(route) for route in routes]
+    kinds = set()
+    for index, (sections, points) in enumerate(resources):
+        expected = []
+        for other, (other_sections, other_points) in enumerate(resources):
+            if other == index:
+                continue
+            shares_section = bool(sections & other_sections)
+            opposite_point = any(points[uuid] != other_points[uuid] for uuid in points.keys() & other_points.keys())
+            if shares_section or opposite_point:
+                expected.append(other)
+            kinds.update(kind for kind, found in [("section", shares_section), ("point", opposite_point)] if found)
+        assert result["conflicts"][index] == expected
+        assert index not in result["conflicts"][index]
+    # Both reasons for a conflict occur
+    assert kinds == {"section", "point"}
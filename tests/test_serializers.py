@@ -0,0 +1,61 @@
+import json
+
+import pytest
+
+from benchmarks.topology_generator import generate_topology
+from interlocking_exporter import serializers
+from interlocking_exporter.exporter import Exporter
+
+# The packages the formats need, they are part of the formats extra
+FORMATS = [("json", None), ("msgpack", "msgpack"), ("cbor", "cbor2")]
+
+
+@pytest.fixture(scope="module")
+def exports():
+    exporter = Exporter(generate_topology(line_length=20, points=3, crossovers=1, double_edge_loops=1, seed=6))
+    return {
+        "topology": exporter.export_topology(),
+        "placement": exporter.export_placement(),
+        "routes": exporter.export_routes(),
+    }
+
+
+@pytest.mark.parametrize("format, package", FORMATS)
+def test_exports_survive_a_round_trip(exports, format, package):
+    if package:
+        pytest.importorskip(package)
+    for export in exports.values():
+        # As stored, e.g. the tuples of an export are read back as lists
+        expected = json.loads(json.dumps(export))
+        assert serializers.loads(serializers.dumps(export, format), format) == expected
+
+
+@pytest.mark.parametrize("format, package", FORMATS[1:])
+def test_interned_exports_survive_a_round_trip(exports, format, package):
+    pytest.importorskip(package)
+    for export in exports.values():
+        expected = json.loads(json.dumps(export))
+        data = serializers.dumps(export, format, intern_uuids=True)
+        assert serializers.loads(data, format, intern_uuids=True) == expected
+
+
+@pytest.mark.parametrize("format, package", FORMATS[1:])
+def test_interning_writes_each_uuid_once(exports, format, package):
+    pytest.importorskip(package)
+    topology = exports["topology"]
+    # The ids of the nodes consist of the uuids of two edges
+    node_id = next(iter(topology["nodes"]))
+    edge_uuid = node_id.split(".")[0]
+
+    data = serializers.dumps(topology, format, intern_uuids=True)
+
+    assert data.count(edge_uuid.encode()) == 1
+    assert node_id.encode() not in data
+    assert len(data) < len(serializers.dumps(topology, format))
+
+
+def test_json_does_not_support_interning():
+    with pytest.raises(ValueError):
+        serializers.dumps({}, "json", intern_uuids=True)
+    with pytest.raises(ValueError):
+        serializers.get_serializer("yaml")
@@ -0,0 +1,109 @@
+import asyncio
+import gzip
+import json
+import pickle
+import socket
+import urllib.error
+import urllib.request
+
+import pytest
+
+websockets = pytest.importorskip("websockets")
+
+from interlocking_exporter.server import ExportServer, brotli
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def get(port: int, path: str, **headers) -> tuple[int, dict, bytes]:
+    request = urllib.request.Request(f"http://127.0.0.1:{port}{path}", headers=headers)
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, dict(response.headers), response.read()
+    except urllib.error.HTTPError as error:
+        return error.code, dict(error.headers), error.read()
+
+
+def run_with_server(server: ExportServer, client) -> None:
+    """Run the coroutine function client with the port of the running server"""
+    port = free_port()
+
+    async def main():
+        task = asyncio.create_task(server.serve("127.0.0.1", port))
+        try:
+            for _ in range(100):
+                try:
+                    _, writer = await asyncio.open_connection("127.0.0.1", port)
+                    writer.close()
+                    break
+                except OSError:
+                    await asyncio.sleep(0.05)
+            await client(port)
+        finally:
+            task.cancel()
+
+    asyncio.run(main())
+
+
+def test_exports_are_served_compressed_and_with_etags(small_topology):
+    server = ExportServer(small_topology)
+
+    async def client(port):
+        loop = asyncio.get_running_loop()
+        status, headers, body = await loop.run_in_executor(
+            None, lambda: get(port, "/placement", **{"Accept-Encoding": "gzip"})
+        )
+        assert status == 200
+        assert headers["Content-Encoding"] == "gzip"
+        assert json.loads(gzip.decompress(body)) == json.loads(json.dumps(server.snapshot.placement))
+
+        status, not_modified, body = await loop.run_in_executor(
+            None, lambda: get(port, "/placement", **{"Accept-Encoding": "gzip", "If-None-Match": headers["ETag"]})
+        )
+        assert (status, body) == (304, b"")
+        assert not_modified["ETag"] == headers["ETag"]
+
+        # Without an acceptable encoding the body is sent uncompressed, with an entity tag of its own
+        status, plain, body = await loop.run_in_executor(
+            None, lambda: get(port, "/routes", **{"Accept-Encoding": "gzip;q=0"})
+        )
+        assert status == 200
+        assert "Content-Encoding" not in plain
+        assert json.loads(body) == json.loads(json.dumps(server.snapshot.routes))
+        status, _, _ = await loop.run_in_executor(
+            None, lambda: get(port, "/placement", **{"If-None-Match": headers["ETag"]})
+        )
+        assert status == 200
+
+        # Brotli is preferred if the server has it
+        status, preferred, _ = await loop.run_in_executor(
+            None, lambda: get(port, "/topology", **{"Accept-Encoding": "gzip, br"})
+        )
+        assert preferred["Content-Encoding"] == ("br" if brotli else "gzip")
+
+        status, _, _ = await loop.run_in_executor(None, lambda: get(port, "/unknown"))
+        assert status == 404
+
+    run_with_server(server, client)
+
+
+def test_clients_receive_the_patch_of_a_reload(small_topology):
+    changed = pickle.loads(pickle.dumps(small_topology))
+    edge = next(iter(changed.edges.values()))
+    edge.length = 1234
+    server = ExportServer(small_topology)
+
+    async def client(port):
+        async with websockets.connect(f"ws://127.0.0.1:{port}/updates") as connection:
+            assert json.loads(await connection.recv()) == {"version": 0}
+            await server.reload(changed)
+            message = json.loads(await connection.recv())
+
+        assert (message["version"], message["previous_version"]) == (1, 0)
+        assert message["patch"]["topology"]["edges"]["changed"][edge.uuid]["laenge"] == 1234
+
+    run_with_server(server, client)
@@ -0,0 +1,38 @@
+from yaramo.additional_signal import AdditionalSignalZs3
+
+from benchmarks.topology_generator import generate_topology
+from interlocking_exporter.exporter import Exporter
+from interlocking_exporter.stats import ExportStats
+
+
+def exporter_and_signal() -> tuple[Exporter, object]:
+    topology = generate_topology(line_length=5, seed=17)
+    stats = ExportStats()
+    return Exporter(topology, stats=stats), next(iter(topology.signals.values()))
+
+
+def test_changed_additional_signals_invalidate_the_cached_state():
+    exporter, signal = exporter_and_signal()
+    before = exporter.generate_signal_state(signal, 40)
+    assert exporter.generate_signal_state(signal, 40) == before
+    assert exporter.stats.counters["signal_state_cache_hits"] == 1
+
+    signal.additional_signals.append(AdditionalSignalZs3([AdditionalSignalZs3.AdditionalSignalSymbolZs3(4)]))
+    after = exporter.generate_signal_state(signal, 40)
+
+    assert "zs3" not in before["state"]
+    assert after["state"]["zs3"] == 4
+    assert after["supported_states"]["zs3"] == [4]
+    assert exporter.stats.counters["signal_states_generated"] == 2
+
+
+def test_each_caller_gets_its_own_copy():
+    exporter, signal = exporter_and_signal()
+    first = exporter.generate_signal_state(signal, 60)
+    expected = exporter.generate_signal_state(signal, 60)
+    first["state"]["main"] = "changed"
+    first["supported_states"]["main"].append("changed")
+    first["supported_states"]["zs3"].append(6)
+
+    assert exporter.generate_signal_state(signal, 60) == expected
+    assert "zs3" not in expected["supported_states"]
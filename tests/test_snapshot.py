@@ -0,0 +1,64 @@
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+
+from interlocking_exporter.exporter import Exporter
+from interlocking_exporter.snapshot import ExportSnapshot, SnapshotHolder
+
+
+def test_concurrent_exports_equal_the_sequential_ones(small_topology):
+    pickled = pickle.dumps(small_topology)
+    sequential = Exporter(pickle.loads(pickled))
+    expected = {
+        "topology": sequential.export_topology(),
+        "placement": sequential.export_placement(),
+        "routes": sequential.export_routes(),
+        "component": {section: dict(entries) for section, entries in sequential.iter_placement([0])},
+    }
+
+    for _ in range(5):
+        exporter = Exporter(pickle.loads(pickled))
+        exports = {
+            "topology": exporter.export_topology,
+            "placement": exporter.export_placement,
+            "routes": exporter.export_routes,
+            "component": lambda: {section: dict(entries) for section, entries in exporter.iter_placement([0])},
+        }
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [(kind, executor.submit(export)) for kind, export in list(exports.items()) * 2]
+            for kind, future in futures:
+                assert future.result() == expected[kind]
+        assert exporter.export_placement() == expected["placement"]
+
+
+def test_reloading_swaps_in_a_new_snapshot_with_the_next_version(small_topology):
+    topology = small_topology
+    holder = SnapshotHolder()
+    first = holder.reload(topology, generate_routes=False)
+
+    assert holder.current is first
+    assert first.version == 0
+    assert first.routes == []
+
+    topology.edges[next(iter(topology.edges))].length = 1234
+    second = holder.reload(topology, generate_routes=False)
+
+    assert holder.current is second
+    assert second.version == 1
+    # Readers holding the previous snapshot keep seeing it unchanged
+    assert first.topology["edges"] != second.topology["edges"]
+    assert list(first.diff(second)) == ["topology"]
+
+
+def test_swapping_returns_the_previous_snapshot(small_topology):
+    exporter = Exporter(small_topology)
+    snapshot = ExportSnapshot.from_exporter(exporter, version=3)
+    holder = SnapshotHolder()
+
+    assert holder.swap(snapshot) is None
+    assert holder.swap(ExportSnapshot(snapshot.exports, version=4)) is snapshot
+    assert holder.current.version == 4
+    assert holder.current.exports == {
+        "topology": exporter.export_topology(),
+        "placement": exporter.export_placement(),
+        "routes": exporter.export_routes(),
+    }
@@ -0,0 +1,24 @@
+import random
+
+from interlocking_exporter.spatial import GridIndex
+
+
+def test_queries_find_the_points_inside_the_box():
+    rnd = random.Random(18)
+    points = [(index, rnd.uniform(0, 100), rnd.uniform(0, 50)) for index in range(1000)]
+    index = GridIndex(points)
+
+    for min_x, min_y, max_x, max_y in [(10, 10, 20, 15), (0, 0, 100, 50), (-5, -5, 3, 3), (50, 50, 40, 60)]:
+        assert index.query(min_x, min_y, max_x, max_y) == [
+            point_id for point_id, x, y in points if min_x <= x <= max_x and min_y <= y <= max_y
+        ]
+
+
+def test_the_cells_of_points_along_a_line_hold_few_points():
+    # A long railway line with a slight curve
+    points = [(index, float(index), (index % 100) / 100) for index in range(10_000)]
+    index = GridIndex(points)
+
+    # One point per unit of length, a cell of sqrt(extent) would hold about 100 of them
+    assert index.cell_size <= 2
+    assert index.query(500, 0, 509.5, 1) == list(range(500, 510))
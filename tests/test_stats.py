@@ -0,0 +1,32 @@
+from interlocking_exporter.exporter import Exporter
+from interlocking_exporter.stats import ExportStats
+
+
+def test_the_phases_and_counters_of_an_export_are_recorded(small_topology):
+    stats = ExportStats()
+    exporter = Exporter(small_topology, stats=stats)
+    routes = exporter.export_routes()
+    exporter.export_routes()
+
+    result = stats.as_dict()
+    for phase in ["vacancy_sections", "routes", "graph_index", "route_traversals", "export_routes"]:
+        assert phase in result["timings"]
+    assert result["calls"]["export_routes"] == 2
+    # Preparation steps only run once
+    assert result["calls"]["routes"] == 1
+    # The time of a phase includes the steps it runs
+    assert result["timings"]["export_routes"] >= result["timings"]["routes"]
+    assert result["counters"]["routes_exported"] == 2 * len(routes)
+    assert result["peak_memory"] == {}
+
+
+def test_nested_phases_report_the_peak_memory_of_their_inner_phases():
+    stats = ExportStats(trace_memory=True)
+    with stats.phase("outer"):
+        with stats.phase("inner"):
+            data = bytearray(4 * 1024 * 1024)
+            del data
+
+    assert stats.peak_memory["inner"] >= 4 * 1024 * 1024
+    assert stats.peak_memory["outer"] >= stats.peak_memory["inner"]
+    assert stats.calls == {"inner": 1, "outer": 1}
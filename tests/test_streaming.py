@@ -0,0 +1,18 @@
+import io
+import json
+
+from interlocking_exporter.exporter import Exporter
+from interlocking_exporter.streaming import write_placement, write_routes, write_topology
+
+
+def test_the_written_exports_equal_those_returned(small_topology):
+    exporter = Exporter(small_topology)
+
+    for write, export in [
+        (write_topology, exporter.export_topology),
+        (write_placement, exporter.export_placement),
+        (write_routes, exporter.export_routes),
+    ]:
+        fp = io.StringIO()
+        write(exporter, fp)
+        assert json.loads(fp.getvalue()) == json.loads(json.dumps(export()))
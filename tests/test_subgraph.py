@@ -0,0 +1,72 @@
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+
+from interlocking_exporter.exporter import Exporter
+
+
+@pytest.fixture
+def placed_topology(small_topology):
+    for position, node in enumerate(small_topology.nodes.values()):
+        node.geo_node = SimpleNamespace(x=float(position), y=float(position % 3))
+    return small_topology
+
+
+def test_a_subgraph_export_does_not_change_the_placement(placed_topology):
+    pickled = pickle.dumps(placed_topology)
+    expected = Exporter(pickle.loads(pickled)).export_placement()
+
+    for uuid in pickle.loads(pickled).nodes:
+        exporter = Exporter(pickle.loads(pickled))
+        exporter.export_subgraph(nodes=[uuid])
+        assert exporter.export_placement() == expected
+
+
+def test_a_subgraph_of_all_edges_equals_the_full_export(placed_topology):
+    exporter = Exporter(placed_topology)
+    topology = exporter.export_topology()
+    placement = exporter.export_placement()
+    routes = exporter.export_routes()
+
+    subgraph = exporter.export_subgraph(edges=exporter.topology.edges)
+
+    assert subgraph["topology"] == topology
+    assert subgraph["placement"] == placement
+    assert subgraph["routes"] == routes
+    assert subgraph["boundary"] == {}
+
+
+def test_a_bbox_slice_holds_the_edges_between_the_nodes_inside(placed_topology):
+    exporter = Exporter(placed_topology)
+    topology = exporter.export_topology()
+    placement = exporter.export_placement()
+    inside = {uuid for uuid, node in exporter.topology.nodes.items() if node.geo_node.x <= 15}
+
+    subgraph = exporter.export_subgraph(bbox=(0, 0, 15, 2))
+
+    assert set(subgraph["topology"]["edges"]) == {
+        uuid
+        for uuid, edge in exporter.topology.edges.items()
+        if edge.node_a.uuid in inside and edge.node_b.uuid in inside
+    }
+    for section in ["edges", "points"]:
+        assert subgraph["placement"][section].items() <= placement[section].items()
+    for section in ["edges", "points", "signals", "axleCountingHeads", "trackVacancySections", "routes"]:
+        assert subgraph["topology"][section].items() <= topology[section].items()
+    for uuid, edge in subgraph["boundary"].items():
+        assert uuid not in subgraph["topology"]["edges"]
+        assert set(edge["nodes"]) <= inside
+
+
+def test_concurrent_subgraph_exports_do_not_change_the_placement(placed_topology):
+    pickled = pickle.dumps(placed_topology)
+    expected = Exporter(pickle.loads(pickled)).export_placement()
+
+    for _ in range(5):
+        exporter = Exporter(pickle.loads(pickled))
+        uuids = list(exporter.topology.nodes)
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(lambda uuid: exporter.export_subgraph(nodes=[uuid]), uuids))
+        assert exporter.export_placement() == expected